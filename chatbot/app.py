@@ -3,211 +3,57 @@ Medical Assistance Chatbot - Flask Web API
 RESTful API for the medical chatbot
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-import pickle
-import numpy as np
-import pandas as pd
-import re
-from difflib import get_close_matches
+import os
+import time
+from medical_engine import (
+    MAX_BATCH_SIZE, MedicalAssistantEngine, batch_records_error, parse_symptom_input, symptom_input_error
+)
+from metrics import LabeledCounter, PrometheusText, StageTimer
+from model_registry import ModelRegistry
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Debug-Timing'])
 
-# Global chatbot instance
+# Global chatbot instance; the registry replaces it when a new model is trained
 chatbot = None
+registry = None
 
-class MedicalAssistantAPI:
-    def __init__(self, model_path='medical_chatbot_model.pkl'):
-        """Initialize the chatbot with trained model"""
-        with open(model_path, 'rb') as f:
-            model_data = pickle.load(f)
-        
-        self.model = model_data['model']
-        self.symptom_list = model_data['symptom_list']
-        self.df_severity = model_data['df_severity']
-        self.df_description = model_data['df_description']
-        self.df_precaution = model_data['df_precaution']
-        self.df_diet = model_data['df_diet']
-        
-        self.symptom_severity_dict = dict(zip(
-            self.df_severity['Symptom'].str.lower().str.replace('_', ' '),
-            self.df_severity['weight']
-        ))
-    
-    def normalize_symptom(self, symptom):
-        """Normalize symptom name and find closest match"""
-        symptom = symptom.lower().strip()
-        symptom = re.sub(r'[^\w\s]', '', symptom)
-        
-        symptom_variants = [
-            symptom,
-            symptom.replace(' ', '_'),
-            symptom.replace('_', ' ')
-        ]
-        
-        for variant in symptom_variants:
-            if variant in self.symptom_list:
-                return variant
-        
-        matches = get_close_matches(symptom, self.symptom_list, n=1, cutoff=0.7)
-        if matches:
-            return matches[0]
-        
-        symptom_underscore = symptom.replace(' ', '_')
-        matches = get_close_matches(symptom_underscore, self.symptom_list, n=1, cutoff=0.7)
-        if matches:
-            return matches[0]
-        
-        return None
-    
-    def predict_disease(self, symptoms, top_n=3):
-        """Predict disease based on symptoms"""
-        symptom_vector = [0] * len(self.symptom_list)
-        
-        valid_symptoms = []
-        invalid_symptoms = []
-        
-        for symptom in symptoms:
-            normalized = self.normalize_symptom(symptom)
-            if normalized:
-                valid_symptoms.append(normalized)
-                idx = self.symptom_list.index(normalized)
-                symptom_vector[idx] = 1
-            else:
-                invalid_symptoms.append(symptom)
-        
-        if sum(symptom_vector) == 0:
-            return None, valid_symptoms, invalid_symptoms
-        
-        symptom_vector = np.array(symptom_vector).reshape(1, -1)
-        probabilities = self.model.predict_proba(symptom_vector)[0]
-        
-        top_indices = np.argsort(probabilities)[-top_n:][::-1]
-        predictions = []
-        
-        for idx in top_indices:
-            disease = self.model.classes_[idx]
-            confidence = probabilities[idx]
-            
-            predictions.append({
-                'disease': disease,
-                'confidence': float(confidence * 100),
-                'description': self.get_disease_description(disease),
-                'precautions': self.get_disease_precautions(disease)
-            })
-        
-        return predictions, valid_symptoms, invalid_symptoms
-    
-    def get_disease_description(self, disease):
-        """Get description of a disease"""
-        desc_row = self.df_description[self.df_description['Disease'] == disease]
-        if not desc_row.empty:
-            return desc_row.iloc[0]['Description']
-        return "Description not available."
-    
-    def get_disease_precautions(self, disease):
-        """Get precautions for a disease"""
-        prec_row = self.df_precaution[self.df_precaution['Disease'] == disease]
-        precautions = []
-        
-        if not prec_row.empty:
-            for col in ['Precaution_1', 'Precaution_2', 'Precaution_3', 'Precaution_4']:
-                if col in prec_row.columns:
-                    prec = prec_row.iloc[0][col]
-                    if pd.notna(prec):
-                        precautions.append(prec)
-        
-        return precautions if precautions else ["Consult a healthcare professional"]
-    
-    def get_symptom_severity(self, symptoms):
-        """Calculate severity score based on symptoms"""
-        total_severity = 0
-        symptom_severities = []
-        
-        for symptom in symptoms:
-            symptom_clean = symptom.lower().replace('_', ' ')
-            severity = self.symptom_severity_dict.get(symptom_clean, 2)
-            total_severity += severity
-            symptom_severities.append({
-                'symptom': symptom,
-                'severity': int(severity)
-            })
-        
-        avg_severity = total_severity / len(symptoms) if symptoms else 0
-        
-        return {
-            'total_severity': int(total_severity),
-            'average_severity': float(avg_severity),
-            'symptom_details': symptom_severities,
-            'severity_level': self.get_severity_level(avg_severity)
-        }
-    
-    def get_severity_level(self, avg_severity):
-        """Classify severity level"""
-        if avg_severity >= 4:
-            return "CRITICAL"
-        elif avg_severity >= 3:
-            return "HIGH"
-        elif avg_severity >= 2:
-            return "MODERATE"
-        else:
-            return "LOW"
-    
-    def get_diet_recommendation(self, chronic_disease=None):
-        """Get diet recommendations"""
-        if chronic_disease:
-            filtered = self.df_diet[self.df_diet['Chronic_Disease'].str.contains(chronic_disease, case=False, na=False)]
-            if not filtered.empty:
-                sample = filtered.sample(1).iloc[0]
-            else:
-                sample = self.df_diet.sample(1).iloc[0]
-        else:
-            sample = self.df_diet.sample(1).iloc[0]
-        
-        return {
-            'meal_plan': sample['Recommended_Meal_Plan'],
-            'calories': int(sample['Recommended_Calories']),
-            'protein': int(sample['Recommended_Protein']),
-            'carbs': int(sample['Recommended_Carbs']),
-            'fats': int(sample['Recommended_Fats'])
-        }
+# Set once the model is loaded and has served a warm-up prediction
+ready = False
+
+# Request counts and latency per endpoint, exported on /metrics
+request_count = LabeledCounter(('endpoint', 'status'))
+request_errors = LabeledCounter(('endpoint',))
+request_latency = StageTimer()
+
+# The engine used to live here under this name; keep it importable
+MedicalAssistantAPI = MedicalAssistantEngine
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    # Opt-in per-request stage breakdown, returned in the X-Debug-Timing header
+    g.debug_timings = {} if request.headers.get('X-Debug-Timing') else None
+
+
+@app.after_request
+def record_request(response):
+    """Count and time every request; add X-Debug-Timing when it was asked for"""
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    elapsed_ms = (time.perf_counter() - g.request_start) * 1000
+    request_count.inc(endpoint, str(response.status_code))
+    if response.status_code >= 400:
+        request_errors.inc(endpoint)
+    request_latency.observe(endpoint, elapsed_ms)
     
-    def get_suggested_symptoms(self, current_symptoms, top_predictions, max_suggestions=8):
-        """Suggest additional symptoms to ask about based on top predictions"""
-        import pandas as pd
-        
-        # Get diseases from top predictions
-        disease_names = [pred['disease'] for pred in top_predictions]
-        
-        # Read the disease dataset to find common symptoms for these diseases
-        df_disease = pd.read_csv('dataset/dataset.csv')
-        
-        # Filter for the top predicted diseases
-        disease_rows = df_disease[df_disease['Disease'].isin(disease_names)]
-        
-        # Collect all symptoms from these diseases
-        symptom_columns = [col for col in disease_rows.columns if 'Symptom' in col]
-        suggested = set()
-        
-        for _, row in disease_rows.iterrows():
-            for col in symptom_columns:
-                if pd.notna(row[col]):
-                    symptom_string = str(row[col])
-                    symptoms = [s.strip() for s in symptom_string.split(',') if s.strip()]
-                    suggested.update(symptoms)
-        
-        # Remove already reported symptoms
-        current_symptoms_normalized = [s.lower().replace(' ', '_') for s in current_symptoms]
-        suggested = suggested - set(current_symptoms_normalized)
-        
-        # Remove empty strings
-        suggested.discard('')
-        
-        # Convert to list and format
-        suggested_list = [s.replace('_', ' ').title() for s in list(suggested)[:max_suggestions]]
-        
-        return suggested_list
+    timings = g.get('debug_timings')
+    if timings is not None:
+        timings['total'] = elapsed_ms
+        response.headers['X-Debug-Timing'] = ', '.join(f'{k}={v:.3f}ms' for k, v in timings.items())
+    return response
 
 
 @app.route('/')
@@ -219,9 +65,14 @@ def home():
         'version': '1.0',
         'endpoints': {
             '/predict': 'POST - Predict disease from symptoms',
+            '/predict/batch': 'POST - Predict diseases for many patients',
+            '/session': 'POST - Start a diagnosis session',
+            '/session/<id>/symptoms': 'POST - Add symptoms to a session and re-score it',
             '/symptoms': 'GET - List all available symptoms',
             '/diseases': 'GET - List all diseases',
-            '/health': 'GET - API health check'
+            '/health': 'GET - API health check',
+            '/metrics': 'GET - Prometheus metrics',
+            '/ready': 'GET - Readiness check (503 until the model is warm)'
         }
     })
 
@@ -229,35 +80,101 @@ def home():
 @app.route('/health')
 def health():
     """Health check endpoint"""
+    engine = chatbot
     return jsonify({
         'status': 'healthy',
-        'model_loaded': chatbot is not None
+        'model_loaded': engine is not None,
+        'model': registry.stats() if registry is not None else None,
+        'response_cache': engine.response_cache.stats() if engine is not None else None,
+        'sessions': engine.sessions.stats() if engine is not None else None,
+        'posterior_table': engine.posterior_table.stats() if engine is not None and engine.posterior_table else None
+    })
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of request, stage, cache and model metrics"""
+    engine = chatbot
+    out = PrometheusText()
+    out.counter('medbot_http_requests_total', request_count, 'HTTP requests by endpoint and status')
+    out.counter('medbot_http_request_errors_total', request_errors, 'HTTP responses with status >= 400')
+    out.declare('medbot_http_request_duration_ms', 'histogram', 'Request handling time in milliseconds')
+    for endpoint, histogram in sorted(request_latency.histograms.items()):
+        out.histogram('medbot_http_request_duration_ms', histogram, {'endpoint': endpoint})
+    
+    out.sample('medbot_model_loaded', int(engine is not None), help_text='1 once a model is loaded')
+    out.sample('medbot_ready', int(ready), help_text='1 once the model is loaded and warm')
+    if engine is not None:
+        out.declare('medbot_stage_duration_ms', 'histogram', 'Time per prediction stage in milliseconds')
+        for stage, histogram in sorted(engine.stages.histograms.items()):
+            out.histogram('medbot_stage_duration_ms', histogram, {'stage': stage})
+        
+        cache = engine.response_cache.stats()
+        for name in ('hits', 'misses', 'evictions', 'expirations'):
+            out.sample(f'medbot_response_cache_{name}_total', cache[name], kind='counter',
+                       help_text=f'Response cache {name}')
+        out.sample('medbot_response_cache_entries', cache['size'], help_text='Responses currently cached')
+        
+        sessions = engine.sessions.stats()
+        out.sample('medbot_sessions_active', sessions['active'], help_text='Diagnosis sessions currently stored')
+        out.sample('medbot_sessions_created_total', sessions['created'], kind='counter',
+                   help_text='Diagnosis sessions started')
+        
+        out.sample('medbot_model_load_seconds', engine.model_load_seconds,
+                   help_text='Time taken by the last model load')
+        if registry is not None:
+            out.sample('medbot_model_swaps_total', registry.swaps, kind='counter',
+                       help_text='New model versions swapped in without a restart')
+            out.sample('medbot_model_failed_loads_total', registry.failed_loads, kind='counter',
+                       help_text='Model versions that failed to load or warm up')
+        manifest = engine.manifest or {}
+        out.sample('medbot_model_info', 1, {
+            'version': manifest.get('version', 'legacy'),
+            'estimator': engine.estimator_name
+        }, help_text='Loaded model version and estimator')
+    
+    return Response(out.render(), content_type=PrometheusText.CONTENT_TYPE)
+
+
+@app.route('/ready')
+def readiness():
+    """Readiness check: 503 until the model is loaded and warmed up"""
+    if not ready:
+        return jsonify({'status': 'loading', 'ready': False}), 503
+    
+    manifest = chatbot.manifest
+    return jsonify({
+        'status': 'ready',
+        'ready': True,
+        'model_version': manifest['version'] if manifest else None
     })
 
 
 @app.route('/symptoms')
 def get_symptoms():
     """Get all available symptoms"""
-    if chatbot is None:
+    engine = chatbot
+    if engine is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
     return jsonify({
         'status': 'success',
-        'count': len(chatbot.symptom_list),
-        'symptoms': [s.replace('_', ' ').title() for s in chatbot.symptom_list]
+        'count': len(engine.symptom_list),
+        'symptoms': [s.replace('_', ' ').title() for s in engine.symptom_list]
     })
 
 
 @app.route('/diseases')
 def get_diseases():
     """Get all diseases"""
-    if chatbot is None:
+    engine = chatbot
+    if engine is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
     return jsonify({
         'status': 'success',
-        'count': len(chatbot.model.classes_),
-        'diseases': list(chatbot.model.classes_)
+        'count': len(engine.classes_),
+        'diseases': list(engine.classes_)
     })
 
 
@@ -273,93 +190,210 @@ def predict():
         if 'symptoms' not in data:
             return jsonify({'error': 'Missing symptoms field'}), 400
         
-        symptoms = data['symptoms']
-        if isinstance(symptoms, str):
-            symptoms = [s.strip() for s in re.split(r'[,;]', symptoms)]
+        error = (symptom_input_error(data['symptoms'])
+                 or symptom_input_error(data.get('ruled_out_symptoms', []), 'ruled_out_symptoms'))
+        if error:
+            return jsonify({'error': error}), 400
+        
+        symptoms = parse_symptom_input(data['symptoms'])
         
         if not symptoms:
             return jsonify({'error': 'No symptoms provided'}), 400
         
-        # Predict
-        predictions, valid_symptoms, invalid_symptoms = chatbot.predict_disease(symptoms, top_n=5)
+        result = chatbot.predict_batch([{
+            'symptoms': symptoms,
+            'ruled_out_symptoms': data.get('ruled_out_symptoms', []),
+            'diet_seed': data.get('diet_seed')
+        }], timings=g.debug_timings)[0]
+        
+        if result['status'] == 'error':
+            return jsonify(result), 400
         
-        if predictions is None:
-            return jsonify({
-                'status': 'error',
-                'message': 'No valid symptoms recognized',
-                'invalid_symptoms': invalid_symptoms
-            }), 400
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Predict diseases for many patients in one request"""
+    if chatbot is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    try:
+        data = request.get_json()
         
-        # Get severity
-        severity_info = chatbot.get_symptom_severity(valid_symptoms)
+        records = data.get('records') if isinstance(data, dict) else None
+        if not isinstance(records, list):
+            return jsonify({'error': 'Missing records field'}), 400
         
-        # Check if we have high confidence (>50%)
-        max_confidence = predictions[0]['confidence']
-        needs_more_symptoms = max_confidence < 50.0
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Too many records (max {MAX_BATCH_SIZE})'}), 400
         
-        # Get suggested symptoms if confidence is low
-        suggested_symptoms = []
-        if needs_more_symptoms:
-            suggested_symptoms = chatbot.get_suggested_symptoms(valid_symptoms, predictions[:3])
+        error = batch_records_error(records)
+        if error:
+            return jsonify({'error': error}), 400
         
-        # Get diet recommendation
-        top_disease = predictions[0]['disease']
-        chronic_diseases = ['Diabetes', 'Hypertension', 'Heart Disease', 'Obesity']
-        chronic_match = next((cd for cd in chronic_diseases if cd.lower() in top_disease.lower()), None)
-        diet_rec = chatbot.get_diet_recommendation(chronic_disease=chronic_match)
+        results = chatbot.predict_batch(records, timings=g.debug_timings)
         
         return jsonify({
             'status': 'success',
-            'valid_symptoms': [s.replace('_', ' ').title() for s in valid_symptoms],
-            'invalid_symptoms': invalid_symptoms,
-            'severity': severity_info,
-            'predictions': predictions[:3],  # Return top 3
-            'needs_more_symptoms': needs_more_symptoms,
-            'max_confidence': max_confidence,
-            'suggested_symptoms': suggested_symptoms,
-            'diet_recommendation': diet_rec,
-            'disclaimer': 'This is an AI-based prediction for informational purposes only. Please consult a healthcare professional.'
+            'count': len(results),
+            'results': results
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/session', methods=['POST'])
+def start_session():
+    """Start a diagnosis session; later rounds only send what changed"""
+    if chatbot is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    try:
+        data = request.get_json()
+        
+        if 'symptoms' not in data:
+            return jsonify({'error': 'Missing symptoms field'}), 400
+        
+        error = (symptom_input_error(data['symptoms'])
+                 or symptom_input_error(data.get('ruled_out_symptoms', []), 'ruled_out_symptoms'))
+        if error:
+            return jsonify({'error': error}), 400
+        
+        symptoms = parse_symptom_input(data['symptoms'])
+        
+        if not symptoms:
+            return jsonify({'error': 'No symptoms provided'}), 400
+        
+        session, result = chatbot.start_session(
+            symptoms, data.get('ruled_out_symptoms', []), data.get('diet_seed'), timings=g.debug_timings
+        )
+        
+        if session is None:
+            return jsonify(result), 400
+        
+        return jsonify(result), 201
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/session/<session_id>/symptoms', methods=['POST'])
+def update_session(session_id):
+    """Add newly confirmed symptoms and declined suggestions to a session"""
+    engine = chatbot
+    if engine is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    try:
+        data = request.get_json()
+        
+        error = (symptom_input_error(data.get('symptoms', []))
+                 or symptom_input_error(data.get('ruled_out_symptoms', []), 'ruled_out_symptoms'))
+        if error:
+            return jsonify({'error': error}), 400
+        
+        session = engine.get_session(session_id)
+        if session is None:
+            return jsonify({'error': 'Session not found or expired'}), 404
+        
+        symptoms = parse_symptom_input(data.get('symptoms', []))
+        ruled_out = parse_symptom_input(data.get('ruled_out_symptoms', []))
+        
+        if not symptoms and not ruled_out:
+            return jsonify({'error': 'No symptoms provided'}), 400
+        
+        result = engine.update_session(session, symptoms, ruled_out, timings=g.debug_timings)
+        
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/session/<session_id>', methods=['DELETE'])
+def end_session(session_id):
+    """Forget a session before its idle timeout"""
+    engine = chatbot
+    if engine is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    if not engine.sessions.delete(session_id):
+        return jsonify({'error': 'Session not found or expired'}), 404
+    
+    return jsonify({'status': 'success', 'session_id': session_id})
+
+
 @app.route('/disease-info/<disease_name>')
 def get_disease_info(disease_name):
     """Get detailed information about a specific disease"""
-    if chatbot is None:
+    engine = chatbot
+    if engine is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
     try:
-        description = chatbot.get_disease_description(disease_name)
-        precautions = chatbot.get_disease_precautions(disease_name)
+        description = engine.get_disease_description(disease_name)
+        precautions = engine.get_disease_precautions(disease_name)
+        record = engine.knowledge_base.get(disease_name)
         
         return jsonify({
             'status': 'success',
             'disease': disease_name,
             'description': description,
-            'precautions': precautions
+            'precautions': precautions,
+            'severity': record.severity if record is not None else None
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-def initialize_chatbot():
-    """Initialize the chatbot model"""
+def activate_engine(engine):
+    """Serve later requests from `engine`; requests already running keep theirs"""
     global chatbot
+    chatbot = engine
+
+
+def initialize_chatbot(model_path=None):
+    """Initialize the chatbot model"""
+    global registry, ready
     try:
         print("Loading medical chatbot model...")
-        chatbot = MedicalAssistantAPI('medical_chatbot_model.pkl')
+        registry = ModelRegistry(model_path, on_swap=activate_engine)
+        registry.load()
+        ready = True
         print("✓ Model loaded successfully!")
     except Exception as e:
         print(f"❌ Error loading model: {str(e)}")
         print("   Please run 'python train_model.py' first to train the model.")
 
 
+def create_app(model_path=None):
+    """WSGI app factory that loads and warms the model before returning the app
+    
+    Under gunicorn with preload_app (see gunicorn.conf.py) this runs once in
+    the master, so forked workers share the loaded model copy-on-write.
+    MEDBOT_MODEL_PATH selects a model other than the default.
+    """
+    if chatbot is None:
+        initialize_chatbot(model_path or os.environ.get('MEDBOT_MODEL_PATH'))
+    return app
+
+
+def start_model_watcher():
+    """Hot-swap newly trained models every MEDBOT_RELOAD_INTERVAL seconds (default 10, 0 disables)"""
+    interval = float(os.environ.get('MEDBOT_RELOAD_INTERVAL', 10))
+    if registry is not None and interval > 0:
+        registry.start(interval)
+
+
 if __name__ == '__main__':
-    initialize_chatbot()
+    create_app()
+    start_model_watcher()
     print("\n" + "=" * 60)
     print("🏥 Medical Assistance Chatbot API Server")
     print("=" * 60)
@@ -367,10 +401,17 @@ if __name__ == '__main__':
     print("\nAvailable endpoints:")
     print("  GET  /            - API information")
     print("  GET  /health      - Health check")
+    print("  GET  /ready       - Readiness check")
+    print("  GET  /metrics     - Prometheus metrics")
     print("  GET  /symptoms    - List all symptoms")
     print("  GET  /diseases    - List all diseases")
     print("  POST /predict     - Predict disease from symptoms")
+    print("  POST /predict/batch - Predict diseases for many patients")
+    print("  POST /session     - Start a diagnosis session")
+    print("  POST /session/<id>/symptoms - Add symptoms to a session")
     print("  GET  /disease-info/<name> - Get disease information")
+    print("\nDevelopment server only; serve production traffic with: gunicorn -c gunicorn.conf.py")
     print("\n" + "=" * 60 + "\n")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # The reloader would load the model a second time; opt in with FLASK_DEBUG=1
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000, threaded=True)
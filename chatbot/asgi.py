@@ -0,0 +1,242 @@
+"""
+Medical Assistance Chatbot - ASGI API
+Asyncio serving path: concurrent /predict requests are coalesced into micro-batches
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Responses match the Flask API in app.py; both sit on medical_engine. Each /predict request waits in a
+MicroBatcher queue and is scored together with its neighbours by a single
+predict_batch call on an inference thread, instead of every request thread
+running the model on its own. Configured through the environment:
+
+    MEDBOT_MAX_BATCH     records per flush (default 64)
+    MEDBOT_MAX_WAIT_MS   how long a flush waits for more requests (default 2)
+    MEDBOT_MODEL_PATH    model artifact or legacy pickle
+    MEDBOT_RELOAD_INTERVAL  seconds between checks for a new model (default 10, 0 disables)
+"""
+
+import asyncio
+import json
+import os
+
+from medical_engine import MAX_BATCH_SIZE, batch_records_error, parse_symptom_input, symptom_input_error
+from micro_batcher import MicroBatcher
+from model_registry import ModelRegistry
+
+CORS_HEADERS = [(b'access-control-allow-origin', b'*')]
+
+
+class ChatbotASGI:
+    """Minimal ASGI application serving /predict, /predict/batch, /health and /ready"""
+
+    def __init__(self, model_path=None, max_batch_size=None, max_wait_ms=None):
+        self.model_path = model_path or os.environ.get('MEDBOT_MODEL_PATH')
+        self.max_batch_size = max_batch_size or int(os.environ.get('MEDBOT_MAX_BATCH', 64))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.environ.get('MEDBOT_MAX_WAIT_MS', 2.0))
+        self.max_wait_ms = max_wait_ms
+        self.reload_interval = float(os.environ.get('MEDBOT_RELOAD_INTERVAL', 10))
+
+        self.chatbot = None
+        self.registry = None
+        self.batcher = None
+        self.ready = False
+
+    async def startup(self):
+        """Load and warm the model off the event loop, then start batching"""
+        loop = asyncio.get_running_loop()
+        print("Loading medical chatbot model...")
+        self.registry = ModelRegistry(self.model_path, on_swap=self.activate_engine)
+        await loop.run_in_executor(None, self.registry.load)
+
+        self.batcher = MicroBatcher(
+            self.score_batch, max_batch_size=self.max_batch_size, max_wait_ms=self.max_wait_ms
+        )
+        await self.batcher.start()
+        if self.reload_interval > 0:
+            self.registry.start(self.reload_interval)
+        self.ready = True
+        print("✓ Model loaded successfully!")
+
+    def activate_engine(self, engine):
+        # Called by the registry; batches already running keep the engine they started with
+        self.chatbot = engine
+
+    def score_batch(self, records):
+        return self.chatbot.predict_batch(records)
+
+    async def shutdown(self):
+        self.ready = False
+        if self.registry is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.registry.stop)
+        if self.batcher is not None:
+            await self.batcher.stop()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        method = scope['method']
+        path = scope['path']
+        if method == 'OPTIONS':
+            # CORS preflight, as flask_cors answers it for the Flask API
+            await send({'type': 'http.response.start', 'status': 204, 'headers': CORS_HEADERS + [
+                (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+                (b'access-control-allow-headers', b'Content-Type'),
+            ]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        if method == 'GET' and path == '/health':
+            status, body = self.health()
+        elif method == 'GET' and path == '/ready':
+            status, body = self.readiness()
+        elif method == 'POST' and path == '/predict':
+            status, body = await self.predict(await _read_json(receive))
+        elif method == 'POST' and path == '/predict/batch':
+            status, body = await self.predict_batch(await _read_json(receive))
+        else:
+            status, body = 404, {'error': 'Not found'}
+
+        await _send_json(send, status, body)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    print(f"❌ Error loading model: {str(e)}")
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def health(self):
+        """Health check with cache and micro-batching statistics"""
+        engine = self.chatbot
+        return 200, {
+            'status': 'healthy',
+            'model_loaded': engine is not None,
+            'model': self.registry.stats() if self.registry is not None else None,
+            'response_cache': engine.response_cache.stats() if engine is not None else None,
+            'posterior_table': engine.posterior_table.stats() if engine is not None and engine.posterior_table else None,
+            'micro_batching': self.batcher.stats() if self.batcher is not None else None
+        }
+
+    def readiness(self):
+        """Readiness check: 503 until the model is loaded and warmed up"""
+        if not self.ready:
+            return 503, {'status': 'loading', 'ready': False}
+        manifest = self.chatbot.manifest
+        return 200, {
+            'status': 'ready',
+            'ready': True,
+            'model_version': manifest['version'] if manifest else None
+        }
+
+    async def predict(self, data):
+        """Predict disease from symptoms; same contract as the Flask /predict"""
+        if not self.ready:
+            return 500, {'error': 'Model not loaded'}
+
+        try:
+            if not isinstance(data, dict) or 'symptoms' not in data:
+                return 400, {'error': 'Missing symptoms field'}
+
+            # Checked before queueing: a malformed record must not share a batch with others
+            error = (symptom_input_error(data['symptoms'])
+                     or symptom_input_error(data.get('ruled_out_symptoms', []), 'ruled_out_symptoms'))
+            if error:
+                return 400, {'error': error}
+
+            symptoms = parse_symptom_input(data['symptoms'])
+
+            if not symptoms:
+                return 400, {'error': 'No symptoms provided'}
+
+            result = await self.batcher.submit({
+                'symptoms': symptoms,
+                'ruled_out_symptoms': data.get('ruled_out_symptoms', []),
+                'diet_seed': data.get('diet_seed')
+            })
+
+            if result['status'] == 'error':
+                return 400, result
+
+            return 200, result
+
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    async def predict_batch(self, data):
+        """Batch requests are already vectorized; they only move off the event loop"""
+        if not self.ready:
+            return 500, {'error': 'Model not loaded'}
+
+        try:
+            records = data.get('records') if isinstance(data, dict) else None
+            if not isinstance(records, list):
+                return 400, {'error': 'Missing records field'}
+
+            if len(records) > MAX_BATCH_SIZE:
+                return 400, {'error': f'Too many records (max {MAX_BATCH_SIZE})'}
+
+            error = batch_records_error(records)
+            if error:
+                return 400, {'error': error}
+
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self.batcher.executor, self.score_batch, records)
+
+            return 200, {
+                'status': 'success',
+                'count': len(results),
+                'results': results
+            }
+
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+
+async def _read_json(receive):
+    """Read the whole request body and decode it as JSON (None if it is not JSON)"""
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    try:
+        return json.loads(b''.join(chunks) or b'null')
+    except ValueError:
+        return None
+
+
+async def _send_json(send, status, body):
+    payload = json.dumps(body, default=_json_default).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': CORS_HEADERS + [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode('ascii')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+def _json_default(value):
+    # NumPy scalars (e.g. class labels) that json cannot encode directly
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+app = ChatbotASGI()
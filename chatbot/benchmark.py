@@ -0,0 +1,993 @@
+"""
+Medical Assistance Chatbot - Benchmarks
+Replays dataset records against the trained model to measure the chatbot hot paths
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from difflib import get_close_matches
+
+import numpy as np
+import pandas as pd
+
+from fast_inference import build_engine
+from medical_engine import MedicalAssistantEngine
+from model_artifact import DEFAULT_ARTIFACT_ROOT, LEGACY_MODEL_PATH, convert_legacy_pickle
+from response_cache import ResponseCache
+from session_store import SessionStore, SharedSessionStore
+from symptom_extractor import SYMPTOM_SYNONYMS, SymptomExtractor
+from symptom_index import get_symptom_columns, rank_by_information_gain
+from symptom_normalizer import SymptomNormalizer, symptom_key
+
+warnings.filterwarnings('ignore')
+
+
+def load_patients(dataset_path='dataset/dataset.csv'):
+    """Distinct (disease, symptoms) records from the training dataset"""
+    df_disease = pd.read_csv(dataset_path)
+    symptom_columns = get_symptom_columns(df_disease)
+
+    patients = []
+    seen = set()
+    for row in df_disease[['Disease'] + symptom_columns].itertuples(index=False):
+        symptoms = [str(s).strip() for s in row[1:] if pd.notna(s) and str(s).strip()]
+        key = (row[0], frozenset(symptoms))
+        if symptoms and key not in seen:
+            seen.add(key)
+            patients.append((row[0], symptoms))
+
+    return patients
+
+
+def legacy_selector(api, valid_symptoms, predictions, ruled_out, max_suggestions=8):
+    """The original selector: an arbitrary slice of the top diseases' symptom set"""
+    suggested = set()
+    for pred in predictions[:3]:
+        suggested.update(s for s, _ in api.disease_symptom_index.get(pred['disease'], ()))
+    suggested -= set(valid_symptoms) | set(ruled_out)
+    return list(suggested)[:max_suggestions]
+
+
+def suggest_from_index(index, disease_names, current_symptoms, max_suggestions=8):
+    """Merge the ranked symptoms of several diseases into one suggestion list
+
+    The frequency baseline the server used before rank_by_information_gain.
+    Symptoms are scored by their summed share across the given diseases, so
+    ones common to several candidates come first. Ties keep the order in which
+    they were first seen.
+    """
+    exclude = set(current_symptoms)
+    exclude.update(s.lower().replace(' ', '_') for s in current_symptoms)
+
+    scores = {}
+    for disease in disease_names:
+        for symptom, share in index.get(disease, ()):
+            if symptom not in exclude:
+                scores[symptom] = scores.get(symptom, 0.0) + share
+
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return ranked[:max_suggestions]
+
+
+def frequency_selector(api, valid_symptoms, predictions, ruled_out, max_suggestions=8):
+    """Symptoms ranked by how often the top diseases list them"""
+    diseases = [pred['disease'] for pred in predictions[:3]]
+    return suggest_from_index(
+        api.disease_symptom_index, diseases, list(valid_symptoms) + list(ruled_out), max_suggestions
+    )
+
+
+def information_gain_selector(api, valid_symptoms, predictions, ruled_out, max_suggestions=8):
+    """Symptoms ranked by expected entropy reduction (what the API serves)"""
+    probabilities = api.get_disease_probabilities(valid_symptoms)
+    return rank_by_information_gain(
+        api.symptom_likelihood, probabilities, api.symptom_list,
+        valid_symptoms, ruled_out, max_suggestions
+    )
+
+
+SELECTORS = {
+    'legacy': legacy_selector,
+    'frequency': frequency_selector,
+    'information-gain': information_gain_selector,
+}
+
+
+def replay_session(api, selector, true_symptoms, target=50.0, max_rounds=10):
+    """Simulate one iterative session starting from the first reported symptom
+
+    The simulated patient confirms every suggestion that is in their record and
+    leaves the rest unselected, which rules them out for later rounds.
+    Returns the number of follow-up rounds needed to reach `target` confidence,
+    or None if the selector ran dry or the session ran out of rounds.
+    """
+    current = true_symptoms[:1]
+    remaining = set(true_symptoms[1:])
+    ruled_out = []
+
+    for rounds in range(max_rounds + 1):
+        predictions, valid_symptoms, _ = api.predict_disease(current, top_n=5)
+        if predictions is None:
+            return None
+        if predictions[0]['confidence'] >= target:
+            return rounds
+        if rounds == max_rounds:
+            break
+
+        suggested = selector(api, valid_symptoms, predictions, ruled_out)
+        if not suggested:
+            return None
+
+        confirmed = [s for s in suggested if s in remaining]
+        ruled_out.extend(s for s in suggested if s not in remaining)
+        current = current + confirmed
+        remaining -= set(confirmed)
+
+    return None
+
+
+def bench_follow_up_rounds(api, patients, target=50.0, max_rounds=10):
+    """Average follow-up rounds to reach the confidence target, per selector"""
+    print(f"\nFollow-up rounds to reach {target:.0f}% confidence ({len(patients)} sessions)")
+    print(f"  {'selector':<18}{'reached':>10}{'avg rounds':>12}{'capped avg':>12}{'ms/session':>12}")
+
+    for name, selector in SELECTORS.items():
+        results = []
+        start = time.perf_counter()
+        for _, symptoms in patients:
+            results.append(replay_session(api, selector, symptoms, target, max_rounds))
+        elapsed = time.perf_counter() - start
+
+        reached = [r for r in results if r is not None]
+        avg_rounds = sum(reached) / len(reached) if reached else float('nan')
+        # Sessions that never reach the target count as max_rounds
+        capped = [max_rounds if r is None else r for r in results]
+        capped_avg = sum(capped) / len(capped)
+        print(f"  {name:<18}{len(reached) / len(patients):>9.1%}{avg_rounds:>12.2f}"
+              f"{capped_avg:>12.2f}{elapsed * 1000 / len(patients):>12.2f}")
+
+
+def legacy_normalize(symptom, symptom_list):
+    """The original normalize_symptom: variant checks, then two full difflib scans"""
+    symptom = symptom.lower().strip()
+    symptom = re.sub(r'[^\w\s]', '', symptom)
+
+    for variant in (symptom, symptom.replace(' ', '_'), symptom.replace('_', ' ')):
+        if variant in symptom_list:
+            return variant
+
+    matches = get_close_matches(symptom, symptom_list, n=1, cutoff=0.7)
+    if matches:
+        return matches[0]
+
+    matches = get_close_matches(symptom.replace(' ', '_'), symptom_list, n=1, cutoff=0.7)
+    if matches:
+        return matches[0]
+
+    return None
+
+
+def make_symptom_tokens(symptom_list, count=500, seed=42):
+    """Free-text style tokens: exact names, typo'd names and garbage"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+
+    def typo(name):
+        text = list(name.replace('_', ' ').title())
+        pos = rng.randrange(len(text))
+        text[pos] = rng.choice(letters)
+        return ''.join(text)
+
+    def garbage():
+        return ''.join(rng.choice(letters + ' ') for _ in range(rng.randint(4, 16))).strip() or 'xyz'
+
+    return {
+        'exact': [rng.choice(symptom_list).replace('_', ' ') for _ in range(count)],
+        'fuzzy': [typo(rng.choice(symptom_list)) for _ in range(count)],
+        'garbage': [garbage() for _ in range(count)],
+    }
+
+
+def bench_normalize(api, repeat=3):
+    """Per-token latency of the legacy normalizer against the compiled one"""
+    tokens = make_symptom_tokens(api.symptom_list)
+    symptom_list = api.symptom_list
+
+    print("\nSymptom normalization (microseconds per token)")
+    print(f"  {'input':<10}{'legacy':>10}{'compiled':>10}{'cached':>10}{'agree':>8}")
+
+    for kind, values in tokens.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            legacy = [legacy_normalize(v, symptom_list) for v in values]
+        legacy_us = (time.perf_counter() - start) * 1e6 / (repeat * len(values))
+
+        # A fresh normalizer per pass measures the uncached path
+        start = time.perf_counter()
+        for _ in range(repeat):
+            normalizer = SymptomNormalizer(symptom_list, cache_size=0)
+            compiled = [normalizer.normalize(v) for v in values]
+        compiled_us = (time.perf_counter() - start) * 1e6 / (repeat * len(values))
+
+        normalizer = SymptomNormalizer(symptom_list)
+        for v in values:
+            normalizer.normalize(v)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for v in values:
+                normalizer.normalize(v)
+        cached_us = (time.perf_counter() - start) * 1e6 / (repeat * len(values))
+
+        agree = sum(a == b for a, b in zip(legacy, compiled)) / len(values)
+        print(f"  {kind:<10}{legacy_us:>10.1f}{compiled_us:>10.1f}{cached_us:>10.2f}{agree:>8.1%}")
+
+
+def process_memory():
+    """Resident and private (unshareable) memory of this process in MB"""
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[1].isdigit():
+                    fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    except OSError:
+        import resource
+        return {'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 'private': float('nan')}
+
+    return {'rss': fields.get('Rss', 0.0), 'private': fields.get('Private_Dirty', 0.0)}
+
+
+# Run in a fresh interpreter so each format pays its own cold start
+LOAD_PROBE = '''
+import json, time, warnings
+warnings.filterwarnings('ignore')
+from medical_engine import MedicalAssistantEngine
+from benchmark import process_memory
+{preload}
+before = process_memory()
+start = time.perf_counter()
+api = MedicalAssistantEngine({path!r})
+seconds = time.perf_counter() - start
+after = process_memory()
+print(json.dumps({{'seconds': seconds, 'rss': after['rss'] - before['rss'],
+                  'private': after['private'] - before['private']}}))
+'''
+
+
+def artifact_path(model_path, tmp):
+    """`model_path` if it is an artifact directory, else the default one, else the legacy pickle converted into `tmp`"""
+    if model_path and os.path.isdir(model_path):
+        return model_path
+    if os.path.isdir(DEFAULT_ARTIFACT_ROOT):
+        return DEFAULT_ARTIFACT_ROOT
+    return convert_legacy_pickle(LEGACY_MODEL_PATH, os.path.join(tmp, 'artifact'))
+
+
+def bench_model_load(model_path=None, repeat=3, preload='import sklearn.ensemble, sklearn.svm'):
+    """Cold load time and per-worker memory: legacy pickle vs artifact directory
+
+    `preload` runs before the clock starts; by default it imports sklearn so
+    the numbers compare the formats rather than library import time.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = artifact_path(model_path, tmp)
+
+        print("\nModel load (fresh process, median of %d)" % repeat)
+        print(f"  {'format':<12}{'load ms':>10}{'RSS MB':>10}{'private MB':>12}")
+
+        for name, path in (('pickle', LEGACY_MODEL_PATH), ('artifact', artifact)):
+            runs = []
+            for _ in range(repeat):
+                out = subprocess.run(
+                    [sys.executable, '-c', LOAD_PROBE.format(path=path, preload=preload)],
+                    capture_output=True, text=True, check=True
+                )
+                runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            runs.sort(key=lambda r: r['seconds'])
+            median = runs[len(runs) // 2]
+            print(f"  {name:<12}{median['seconds'] * 1000:>10.1f}{median['rss']:>10.1f}"
+                  f"{median['private']:>12.1f}")
+
+
+# Timed from before the engine import; memory is read inline, without importing benchmark
+STARTUP_PROBE = '''
+import time
+start = time.perf_counter()
+import json, sys, warnings
+warnings.filterwarnings('ignore')
+from medical_engine import MedicalAssistantEngine
+api = MedicalAssistantEngine({path!r})
+api.score_symptom_lists([api.symptom_list[:3]])
+{touch}
+seconds = time.perf_counter() - start
+with open('/proc/self/status') as f:
+    rss = next(int(line.split()[1]) / 1024 for line in f if line.startswith('VmRSS'))
+print(json.dumps({{'seconds': seconds, 'rss': rss,
+                  'modules': [m for m in ('sklearn', 'scipy', 'pandas') if m in sys.modules]}}))
+'''
+
+
+def import_time_ms(stderr):
+    """Total of the self times in `python -X importtime` output"""
+    total = 0
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if line.startswith('import time:') and len(parts) == 3 and parts[0].split()[-1].isdigit():
+            total += int(parts[0].split()[-1])
+    return total / 1000
+
+
+def bench_startup(model_path=None, repeat=3):
+    """Boot to first prediction in a fresh interpreter: predictor only vs loading every part
+
+    Runs under `python -X importtime`; 'wall' includes interpreter start-up,
+    'boot' is from the engine import to the first prediction.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = artifact_path(model_path, tmp)
+        everything = 'api.model, api.knowledge_base, api.diet_index'
+        variants = [('artifact, predictor only', artifact, ''), ('artifact, every part', artifact, everything)]
+        if os.path.exists(LEGACY_MODEL_PATH):
+            variants.append(('legacy pickle', LEGACY_MODEL_PATH, everything))
+
+        print(f"\nStart-up to first prediction (fresh process, median of {repeat})")
+        print(f"  {'load':<26}{'wall ms':>9}{'boot ms':>9}{'import ms':>11}{'RSS MB':>9}  imported")
+        for name, path, touch in variants:
+            median = startup_run(path, touch, repeat)
+            print(f"  {name:<26}{median['wall'] * 1000:>9.0f}{median['seconds'] * 1000:>9.0f}"
+                  f"{median['imports']:>11.0f}{median['rss']:>9.1f}  {', '.join(median['modules']) or '-'}")
+
+
+def startup_run(path, touch, repeat):
+    """Median (by wall time) of `repeat` STARTUP_PROBE runs"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_PROBE.format(path=path, touch=touch)],
+            capture_output=True, text=True, check=True
+        )
+        run = json.loads(out.stdout.strip().splitlines()[-1])
+        run['wall'] = time.perf_counter() - start
+        run['imports'] = import_time_ms(out.stderr)
+        runs.append(run)
+    runs.sort(key=lambda r: r['wall'])
+    return runs[len(runs) // 2]
+
+
+def make_symptom_lists(patients, count, seed=42):
+    """Random non-empty subsets of real patient records"""
+    rng = random.Random(seed)
+    symptom_lists = []
+    for _ in range(count):
+        _, symptoms = rng.choice(patients)
+        symptom_lists.append(rng.sample(symptoms, rng.randint(1, len(symptoms))))
+    return symptom_lists
+
+
+def make_symptom_matrix(api, patients, rows, seed=42):
+    """Feature rows made of random non-empty subsets of real patient records"""
+    X, _, _ = api.vectorize_symptoms(make_symptom_lists(patients, rows, seed))
+    return X
+
+
+def time_per_call(fn, X, min_seconds=0.2):
+    """Mean seconds per fn(X) call, repeating until min_seconds have passed"""
+    fn(X)
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def bench_inference(api, patients):
+    """predict_proba latency of sklearn and of the engines at batch sizes 1, 32 and 1024
+
+    That the engines return sklearn's probabilities is checked by
+    test_fast_inference.py and test_medical_engine.py.
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.naive_bayes import BernoulliNB, MultinomialNB
+
+    X_train, _, _ = api.vectorize_symptoms([symptoms for _, symptoms in patients])
+    y_train = [disease for disease, _ in patients]
+
+    models = [('served', api.model, api.engine)]
+    if api.posterior_table is not None:
+        models.append(('direct', api.model, api.posterior_table.fallback))
+    for name, model in (('bnb', BernoulliNB()), ('mnb', MultinomialNB()),
+                        ('logreg', LogisticRegression(max_iter=1000))):
+        model.fit(X_train, y_train)
+        models.append((name, model, build_engine(model)))
+
+    X_requests = make_symptom_matrix(api, patients, 1024, seed=7)
+
+    print("\nInference engine vs sklearn predict_proba")
+    print(f"  {'model':<8}{'engine':<16}{'batch':>7}{'sklearn ms':>12}{'engine ms':>11}{'speedup':>9}")
+    for name, model, engine in models:
+        for batch in (1, 32, 1024):
+            X = X_requests[:batch]
+            sk = time_per_call(model.predict_proba, X)
+            fast = time_per_call(engine.predict_proba, X)
+            print(f"  {name:<8}{type(engine).__name__:<16}{batch:>7}{sk * 1000:>12.3f}"
+                  f"{fast * 1000:>11.3f}{sk / fast:>8.1f}x")
+
+    # Severity of a whole matrix in one product, against one lookup per symptom per row
+    symptom_lists = [[api.symptom_list[i] for i in np.flatnonzero(row)] for row in X_requests]
+    lookups = time_per_call(lambda _: [api.get_symptom_severity(s) for s in symptom_lists], X_requests)
+    product = time_per_call(api.severity_scores, X_requests)
+    print(f"\nSeverity of {len(X_requests)} rows: per-row lookups {lookups * 1000:.3f} ms, "
+          f"matrix product {product * 1000:.3f} ms ({lookups / product:.1f}x)")
+
+
+def bench_response_cache(api, patients, requests=2000, distinct=50, seed=42):
+    """Per-request /predict latency with and without the response cache
+
+    Traffic repeats a pool of `distinct` symptom combinations with Zipf-like
+    popularity, in shuffled symptom order, as real /predict traffic does.
+    """
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(distinct):
+        _, symptoms = rng.choice(patients)
+        pool.append(rng.sample(symptoms, rng.randint(1, min(3, len(symptoms)))))
+    weights = [1 / rank for rank in range(1, distinct + 1)]
+    stream = [rng.sample(combo, len(combo)) for combo in rng.choices(pool, weights, k=requests)]
+
+    cache = api.response_cache
+    print(f"\nResponse cache ({requests} requests over {distinct} symptom combinations)")
+    print(f"  {'cache':<10}{'ms/request':>12}{'hit ratio':>11}")
+    for name, response_cache in (('disabled', ResponseCache(maxsize=0)), ('enabled', cache)):
+        api.response_cache = response_cache
+        response_cache.clear()
+        hits = response_cache.hits
+        start = time.perf_counter()
+        for symptoms in stream:
+            api.predict_batch([symptoms])
+        elapsed = time.perf_counter() - start
+        ratio = (response_cache.hits - hits) / len(stream)
+        print(f"  {name:<10}{elapsed / len(stream) * 1000:>12.3f}{ratio:>11.1%}")
+    api.response_cache = cache
+
+
+def key_nbytes(key):
+    """Bytes held by a response-cache key tuple, including the objects it references"""
+    total = sys.getsizeof(key)
+    for part in key:
+        total += sys.getsizeof(part)
+        if isinstance(part, frozenset):
+            total += sum(sys.getsizeof(item) for item in part)
+    return total
+
+
+def bench_memory(api, patients, requests=1000, dataset_path='dataset/dataset.csv'):
+    """Bytes of the training matrix and of per-request vectors and cache keys, before and after bit packing"""
+    from symptom_bits import deduplicate, matrix_nbytes, pack_rows
+    from symptom_index import encode_symptom_matrix
+
+    X, y, symptom_list = encode_symptom_matrix(pd.read_csv(dataset_path))
+    packed = pack_rows(X)
+    unique, _, _ = deduplicate(packed, y)
+
+    print(f"\nTraining matrix ({X.shape[0]} records x {X.shape[1]} symptoms)")
+    print(f"  {'representation':<28}{'rows':>7}{'KB':>10}")
+    for name, rows, nbytes in (
+        ('dense int64', X.shape[0], X.shape[0] * X.shape[1] * 8),
+        ('CSR int8', X.shape[0], matrix_nbytes(X)),
+        ('packed bits', len(packed), matrix_nbytes(packed)),
+        ('packed bits, deduplicated', len(unique), matrix_nbytes(unique)),
+    ):
+        print(f"  {name:<28}{rows:>7}{nbytes / 1024:>10.1f}")
+
+    symptom_lists = make_symptom_lists(patients, requests)
+    features, valid_lists, _ = api.vectorize_symptoms(symptom_lists)
+    ruled_out = frozenset(api.symptom_list[:3])
+    legacy_keys = [
+        (frozenset(api.symptom_to_index[s] for s in valid), ruled_out, 5) for valid in valid_lists
+    ]
+    bits = np.packbits(features, axis=1)
+    keys = [api.response_key(row.tobytes(), ruled_out, 5) for row in bits]
+
+    print(f"\nRequest path (per request, mean of {requests})")
+    print(f"  {'':<20}{'before':>10}{'after':>10}")
+    print(f"  {'feature vector':<20}{len(symptom_list) * 8:>9}B{features[0].nbytes:>9}B")
+    print(f"  {'cache key':<20}{np.mean([key_nbytes(k) for k in legacy_keys]):>9.0f}B"
+          f"{np.mean([key_nbytes(k) for k in keys]):>9.0f}B")
+
+
+SENTENCE_OPENERS = ['', 'I have ', 'I have been having ', 'Since yesterday I feel ', 'My child has ']
+SENTENCE_JOINERS = [', ', ' and ', ' with ', ', also ', ' plus ']
+SENTENCE_ENDINGS = ['', ' since yesterday', ' for three days', ', it is getting worse', '.']
+
+
+# Patient wording collected separately from SYMPTOM_SYNONYMS and never added to it: recall on
+# these sentences is what the extractor achieves on phrasings it was not built from. Each
+# phrasing lists every symptom it names, the one it stands for first
+HELD_OUT_PHRASINGS = {
+    'pain in my abdomen': ('abdominal_pain',),
+    'cramps in my gut': ('abdominal_pain', 'cramps'),
+    'on edge': ('anxiety',),
+    'nervous all the time': ('anxiety',),
+    'my back hurts': ('back_pain',),
+    'lower back is killing me': ('back_pain',),
+    'vision is fuzzy': ('blurred_and_distorted_vision',),
+    "can't see clearly": ('blurred_and_distorted_vision',),
+    "can't catch my breath": ('breathlessness',),
+    'out of breath': ('breathlessness',),
+    'pain in my chest': ('chest_pain',),
+    'my chest hurts': ('chest_pain',),
+    'teeth chattering': ('chills',),
+    'the shivers': ('chills', 'shivering'),
+    "can't poop": ('constipation',),
+    'hard stools': ('constipation',),
+    'sneezing fits': ('continuous_sneezing',),
+    'cannot stop sneezing': ('continuous_sneezing',),
+    'hacking cough': ('cough',),
+    'coughing up phlegm': ('cough', 'phlegm'),
+    'the runs': ('diarrhoea',),
+    'runny stool': ('diarrhoea',),
+    'the room is spinning': ('dizziness', 'spinning_movements'),
+    'feel faint': ('dizziness',),
+    'no energy': ('fatigue',),
+    'always sleepy': ('fatigue',),
+    'wiped out': ('fatigue',),
+    'my head hurts': ('headache',),
+    'pounding head': ('headache',),
+    'running a temperature': ('high_fever',),
+    'burning up': ('high_fever',),
+    'scratching all the time': ('itching',),
+    'my skin itches': ('itching',),
+    'my joints hurt': ('joint_pain',),
+    'aching knees': ('joint_pain', 'knee_pain'),
+    'lost my appetite': ('loss_of_appetite',),
+    'off my food': ('loss_of_appetite',),
+    'my muscles hurt': ('muscle_pain',),
+    'muscles are sore': ('muscle_pain',),
+    'sick to my stomach': ('nausea',),
+    'feel like I might be sick': ('nausea',),
+    'my neck is sore': ('neck_pain',),
+    'my neck hurts': ('neck_pain',),
+    'nose keeps running': ('runny_nose',),
+    'dripping nose': ('runny_nose',),
+    'red spots on my skin': ('skin_rash', 'red_spots_over_body'),
+    'breaking out in spots': ('skin_rash',),
+    'my stomach hurts': ('stomach_pain',),
+    'tummy cramps': ('stomach_pain', 'cramps'),
+    'drenched in sweat': ('sweating',),
+    'sweating buckets': ('sweating',),
+    'my throat is raw': ('throat_irritation',),
+    'throat feels scratchy': ('throat_irritation',),
+    "can't keep food down": ('vomiting',),
+    'been sick several times': ('vomiting',),
+    'put on weight': ('weight_gain',),
+    'getting heavier': ('weight_gain',),
+    'dropped a few kilos': ('weight_loss',),
+    'getting thinner': ('weight_loss',),
+    'skin turned yellow': ('yellowish_skin',),
+    'my skin looks yellow': ('yellowish_skin',),
+}
+
+
+def make_sentences(patients, count=2000, seed=42, phrasings=None):
+    """Free-text complaints with known answers: (text, present, negated)
+
+    Each sentence names 1-4 symptoms of a dataset record and sometimes
+    denies another. By default symptoms are spelled as in the vocabulary or
+    as one of their SYMPTOM_SYNONYMS. `phrasings` ({symptom: [(text,
+    symptoms it names), ...]}) replaces those spellings, and then only
+    symptoms that have some are used; everything a chosen phrasing names
+    counts as mentioned.
+    """
+    rng = random.Random(seed)
+    if phrasings is None:
+        phrasings = {
+            s: [(form, (s,)) for form in (s.replace('_', ' ').strip(), *SYMPTOM_SYNONYMS.get(s, ()))]
+            for _, record in patients for s in record
+        }
+        deniable = list(SYMPTOM_SYNONYMS)
+    else:
+        deniable = list(phrasings)
+    patients = [(d, [s for s in symptoms if s in phrasings]) for d, symptoms in patients]
+    patients = [(d, symptoms) for d, symptoms in patients if symptoms]
+
+    sentences = []
+    for _ in range(count):
+        _, symptoms = rng.choice(patients)
+        present = []
+        parts = []
+        for symptom in rng.sample(symptoms, rng.randint(1, min(4, len(symptoms)))):
+            text, names = rng.choice(phrasings[symptom])
+            parts.append(text)
+            present.extend(n for n in names if n not in present)
+        text = rng.choice(SENTENCE_OPENERS) + parts[0]
+        for part in parts[1:]:
+            text += rng.choice(SENTENCE_JOINERS) + part
+        negated = []
+        others = [s for s in deniable if s not in symptoms and s not in present]
+        if rng.random() < 0.3:
+            denial, names = rng.choice(phrasings.get(rng.choice(others)) or [(others[0].replace('_', ' '), others[:1])])
+            negated.extend(n for n in names if n not in present)
+            text += ' but no ' + denial
+        sentences.append((text + rng.choice(SENTENCE_ENDINGS), present, negated))
+    return sentences
+
+
+def held_out_phrasings(api):
+    """HELD_OUT_PHRASINGS by the symptom they stand for, minus any the extractor lists verbatim
+
+    Only phrasings whose symptoms are all in the vocabulary are kept.
+    """
+    known = {symptom_key(s) for s in api.symptom_list}
+    known.update(symptom_key(v) for variants in SYMPTOM_SYNONYMS.values() for v in variants)
+    phrasings = {}
+    for text, names in HELD_OUT_PHRASINGS.items():
+        if symptom_key(text) not in known and all(n in api.symptom_to_index for n in names):
+            phrasings.setdefault(names[0], []).append((text, names))
+    return phrasings
+
+
+def bench_extraction(api, patients, count=2000):
+    """Symptom recall and throughput on free text: chunk splitting vs the phrase matcher
+
+    'known' sentences use the vocabulary names and synonyms the matcher is
+    built from, so its recall there is an upper bound; 'held-out' sentences
+    use HELD_OUT_PHRASINGS, wording the matcher was not built from.
+    """
+    normalizer = SymptomNormalizer(api.symptom_list, cache_size=0)
+    extractor = SymptomExtractor(api.symptom_list, api.model_data['severity_weights'], cache_size=0)
+
+    def split_chunks(text):
+        return [n for n in (normalizer.normalize(c) for c in re.split(r'[,;]', text) if c.strip()) if n], []
+
+    def phrase_matcher(text):
+        return extractor.extract(text)
+
+    def matcher_then_normalizer(text):
+        # What extract_symptoms and the normalizer do together: unmatched words get a fuzzy match
+        present, negated, unmatched = extractor.extract(text)
+        present, negated = list(present), list(negated)
+        for words, is_negated in unmatched:
+            symptom = normalizer.normalize(words)
+            if symptom:
+                (negated if is_negated else present).append(symptom)
+        return present, negated
+
+    methods = (('split on [,;]', split_chunks), ('phrase matcher', phrase_matcher),
+               ('+ normalizer', matcher_then_normalizer))
+    phrasings = held_out_phrasings(api)
+    corpora = [('known', make_sentences(patients, count)),
+               ('held-out', make_sentences(patients, count, phrasings=phrasings))]
+
+    print(f"\nFree-text extraction ({count} generated sentences per corpus, {extractor.phrase_count} phrases; "
+          f"held-out: {sum(map(len, phrasings.values()))} phrasings of {len(phrasings)} symptoms)")
+    print(f"  {'corpus':<10}{'method':<16}{'sentences/s':>13}{'recall':>9}{'precision':>11}{'negations':>11}")
+    for corpus, sentences in corpora:
+        for name, extract in methods:
+            start = time.perf_counter()
+            results = [extract(text) for text, _, _ in sentences]
+            elapsed = time.perf_counter() - start
+
+            expected = sum(len(present) for _, present, _ in sentences)
+            found = sum(len(set(r[0])) for r in results)
+            correct = sum(len(set(r[0]) & set(present)) for r, (_, present, _) in zip(results, sentences))
+            denials = sum(len(negated) for _, _, negated in sentences)
+            caught = sum(len(set(r[1]) & set(negated)) for r, (_, _, negated) in zip(results, sentences))
+            print(f"  {corpus:<10}{name:<16}{len(sentences) / elapsed:>13,.0f}{correct / expected:>9.1%}"
+                  f"{correct / found if found else 0.0:>11.1%}{caught / denials if denials else 0.0:>11.1%}")
+
+
+def session_scripts(api, patients, count=300, max_rounds=4, seed=42):
+    """Iterative-flow transcripts: (first symptoms, [(confirmed, declined), ...]) per patient
+
+    As in the web client, the patient starts from one symptom, confirms the
+    suggestions that are in their record and declines the rest.
+    """
+    rng = random.Random(seed)
+    scripts = []
+    for _, symptoms in rng.sample(patients, min(count, len(patients))):
+        first = symptoms[:1]
+        remaining = set(symptoms[1:])
+        session, response = api.start_session(first)
+        rounds = []
+        while response['needs_more_symptoms'] and len(rounds) < max_rounds:
+            suggested = [s.lower().replace(' ', '_') for s in response['suggested_symptoms']]
+            confirmed = [s for s in suggested if s in remaining]
+            if not confirmed:
+                break
+            declined = [s for s in suggested if s not in remaining]
+            rounds.append((confirmed, declined))
+            response = api.update_session(session, confirmed, declined)
+        api.sessions.delete(session.session_id)
+        if rounds:
+            scripts.append((first, rounds))
+    return scripts
+
+
+def bench_sessions(api, patients, count=300, max_rounds=4):
+    """Follow-up round cost: re-POSTing everything to /predict vs a server-side session
+
+    Each session round looks the session up by id first, as the /session
+    handler does, both in the in-process store and in the SQLite store
+    that gunicorn workers share.
+    """
+    scripts = session_scripts(api, patients, count, max_rounds)
+    rounds = sum(len(r) for _, r in scripts)
+
+    def stateless():
+        payload = 0
+        for first, script in scripts:
+            symptoms, ruled_out = list(first), []
+            api.predict_batch([{'symptoms': symptoms, 'ruled_out_symptoms': ruled_out}])
+            for confirmed, declined in script:
+                symptoms += confirmed
+                ruled_out += declined
+                body = {'symptoms': symptoms, 'ruled_out_symptoms': ruled_out}
+                payload += len(json.dumps(body))
+                api.predict_batch([body])
+        return payload
+
+    def stateful():
+        payload = 0
+        for first, script in scripts:
+            session, _ = api.start_session(first)
+            session_id = session.session_id
+            for confirmed, declined in script:
+                payload += len(json.dumps({'symptoms': confirmed, 'ruled_out_symptoms': declined}))
+                api.update_session(api.get_session(session_id), confirmed, declined)
+            api.sessions.delete(session_id)
+        return payload
+
+    sessions = api.sessions
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = [
+            ('session, in-process', SessionStore()),
+            ('session, SQLite', SharedSessionStore(os.path.join(tmp, 'sessions.sqlite3'))),
+        ]
+        print(f"\nFollow-up rounds ({len(scripts)} sessions, {rounds} rounds after the first)")
+        print(f"  {'flow':<22}{'ms/session':>12}{'request bytes/round':>21}")
+        try:
+            for name, store in [('re-POST /predict', None), *stores]:
+                api.sessions = store
+                api.response_cache.clear()
+                start = time.perf_counter()
+                payload = stateless() if store is None else stateful()
+                elapsed = time.perf_counter() - start
+                print(f"  {name:<22}{elapsed * 1000 / len(scripts):>12.3f}{payload / rounds:>21.1f}")
+        finally:
+            api.sessions = sessions
+
+
+def measure(fn, inputs, min_seconds=0.5, min_samples=20, sample_seconds=1e-4):
+    """Per-call latency of fn over `inputs`, cycled, in milliseconds
+
+    Calls are timed in groups lasting about `sample_seconds`, so microsecond
+    functions are not swamped by timer overhead; percentiles are over the
+    per-call means of those groups.
+    """
+    start = time.perf_counter()
+    fn(inputs[0])
+    group = max(1, int(sample_seconds / max(time.perf_counter() - start, 1e-9)))
+
+    samples = []
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_seconds or len(samples) < min_samples:
+        t0 = time.perf_counter()
+        for _ in range(group):
+            fn(inputs[calls % len(inputs)])
+            calls += 1
+        samples.append((time.perf_counter() - t0) / group)
+
+    samples.sort()
+    return {
+        'calls': calls,
+        'mean_ms': sum(samples) / len(samples) * 1000,
+        'p50_ms': samples[len(samples) // 2] * 1000,
+        'p99_ms': samples[min(int(len(samples) * 0.99), len(samples) - 1)] * 1000,
+    }
+
+
+def bench_suite(api, patients, model_path=None, load_repeat=3):
+    """Latency of every hot path, as {case: {'calls', 'mean_ms', 'p50_ms', 'p99_ms'}}
+
+    Inputs come from dataset.csv. Normalization and extraction are timed
+    without their caches, otherwise every input costs the same dictionary lookup.
+    """
+    import app as flask_app
+
+    results = {}
+    tokens = make_symptom_tokens(api.symptom_list)
+    normalizer = SymptomNormalizer(api.symptom_list, cache_size=0)
+    for kind, values in tokens.items():
+        results[f'normalize_{kind}'] = measure(normalizer.normalize, values)
+
+    extractor = SymptomExtractor(api.symptom_list, api.model_data['severity_weights'], cache_size=0)
+    sentences = [text for text, _, _ in make_sentences(patients, 200)]
+    results['extract_sentence'] = measure(extractor.extract, sentences)
+
+    symptom_lists = make_symptom_lists(patients, 200)
+    for top_n in (3, 5):
+        results[f'predict_disease_top{top_n}'] = measure(
+            lambda symptoms: api.predict_disease(symptoms, top_n), symptom_lists
+        )
+
+    scored = []
+    for symptoms in symptom_lists:
+        predictions, valid, _ = api.predict_disease(symptoms)
+        scored.append((valid, predictions))
+    results['get_suggested_symptoms'] = measure(
+        lambda case: api.get_suggested_symptoms(case[0], case[1]), scored
+    )
+
+    rng = random.Random(42)
+    profiles = [
+        (rng.choice([None, 'Diabetes', 'Hypertension', 'Heart Disease', 'Obesity']), rng.randint(18, 80))
+        for _ in range(200)
+    ]
+    results['get_diet_recommendation'] = measure(
+        lambda profile: api.get_diet_recommendation(chronic_disease=profile[0], age=profile[1]), profiles
+    )
+
+    # Fresh interpreter per load, sklearn imported before the clock starts
+    loads = []
+    for _ in range(load_repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', LOAD_PROBE.format(
+                path=model_path, preload='import sklearn.ensemble, sklearn.svm'
+            )],
+            capture_output=True, text=True, check=True
+        )
+        loads.append(json.loads(out.stdout.strip().splitlines()[-1])['seconds'] * 1000)
+    loads.sort()
+    results['model_load'] = {
+        'calls': len(loads), 'mean_ms': sum(loads) / len(loads),
+        'p50_ms': loads[len(loads) // 2], 'p99_ms': loads[-1]
+    }
+
+    # End to end through Flask, with the response cache off and then warm
+    previous = flask_app.chatbot
+    flask_app.chatbot = api
+    client = flask_app.app.test_client()
+    cache = api.response_cache
+    try:
+        api.response_cache = ResponseCache(maxsize=0)
+        results['predict_endpoint'] = measure(
+            lambda symptoms: client.post('/predict', json={'symptoms': symptoms}), symptom_lists
+        )
+        api.response_cache = cache
+        for symptoms in symptom_lists:
+            client.post('/predict', json={'symptoms': symptoms})
+        results['predict_endpoint_cached'] = measure(
+            lambda symptoms: client.post('/predict', json={'symptoms': symptoms}), symptom_lists
+        )
+    finally:
+        api.response_cache = cache
+        flask_app.chatbot = previous
+
+    print("\nHot path suite (milliseconds per call)")
+    print(f"  {'case':<28}{'calls':>8}{'mean':>10}{'p50':>10}{'p99':>10}")
+    for name, r in results.items():
+        print(f"  {name:<28}{r['calls']:>8}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}")
+
+    return results
+
+
+def suite_metadata(api):
+    """What the suite ran against, so reports from different commits can be told apart"""
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'estimator': api.estimator_name,
+        'model_version': api.manifest['version'] if api.manifest else None,
+    }
+
+
+def compare_suite(results, baseline, threshold, min_delta_ms=0.01):
+    """Print p50 changes against a baseline report; return the regressed case names
+
+    A case regresses when its p50 is more than `threshold` (a fraction) and
+    more than `min_delta_ms` slower than the baseline's; the absolute floor
+    keeps microsecond-scale jitter from failing the run. Cases missing from
+    either side are skipped.
+    """
+    regressions = []
+    print(f"\nCompared with {baseline.get('meta', {}).get('commit') or 'baseline'} "
+          f"(fail above +{threshold:.0%} p50)")
+    print(f"  {'case':<28}{'baseline':>10}{'current':>10}{'change':>9}")
+    for name, r in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base or not base['p50_ms']:
+            continue
+        change = r['p50_ms'] / base['p50_ms'] - 1
+        regressed = change > threshold and r['p50_ms'] - base['p50_ms'] > min_delta_ms
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<28}{base['p50_ms']:>10.3f}{r['p50_ms']:>10.3f}{change:>+9.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+CASES = ['normalize', 'extract', 'rounds', 'load', 'startup', 'inference', 'cache', 'memory', 'sessions', 'suite']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the medical chatbot hot paths')
+    parser.add_argument('cases', nargs='*', help=f"Cases to run: {', '.join(CASES)} (default: all)")
+    parser.add_argument('--model', default=None, help='Artifact directory or legacy pickle')
+    parser.add_argument('--target', type=float, default=50.0, help='Confidence target in percent')
+    parser.add_argument('--max-rounds', type=int, default=10)
+    parser.add_argument('--json', metavar='PATH', help='Write the suite results to a JSON report')
+    parser.add_argument('--compare', metavar='PATH', help='Baseline JSON report to compare the suite with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed p50 slowdown against --compare before failing (default 0.25)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.01,
+                        help='Ignore p50 slowdowns smaller than this many milliseconds (default 0.01)')
+    args = parser.parse_args()
+    cases = args.cases or CASES
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    if 'load' in cases:
+        bench_model_load(args.model)
+    if 'startup' in cases:
+        bench_startup(args.model)
+
+    api = MedicalAssistantEngine(args.model)
+
+    if 'normalize' in cases:
+        bench_normalize(api)
+    if 'extract' in cases:
+        bench_extraction(api, load_patients())
+    if 'rounds' in cases:
+        bench_follow_up_rounds(api, load_patients(), args.target, args.max_rounds)
+    if 'inference' in cases:
+        bench_inference(api, load_patients())
+    if 'cache' in cases:
+        bench_response_cache(api, load_patients())
+    if 'memory' in cases:
+        bench_memory(api, load_patients())
+    if 'sessions' in cases:
+        bench_sessions(api, load_patients())
+    if 'suite' in cases:
+        results = bench_suite(api, load_patients(), args.model)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'meta': suite_metadata(api), 'results': results}, f, indent=2)
+            print(f"✓ Wrote {args.json}")
+        if args.compare:
+            with open(args.compare, encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare_suite(results, baseline, args.threshold, args.min_delta_ms)
+            if regressions:
+                print(f"❌ Regressed: {', '.join(regressions)}")
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
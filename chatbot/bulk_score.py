@@ -0,0 +1,255 @@
+"""
+Medical Assistance Chatbot - Bulk Scoring
+Streams a CSV or JSONL patient file through the model in chunks and writes predictions as it goes
+
+    python bulk_score.py intake.csv predictions.jsonl --workers 8 --chunk-size 2048
+
+Input rows are read a chunk at a time and scored by a pool of worker
+processes, each holding its own MedicalAssistantEngine (artifact arrays are
+memory-mapped, so workers share them). At most two chunks per worker are in
+flight and results are written in input order as soon as they are ready, so
+memory stays flat however long the file is.
+
+CSV input takes its symptoms from a 'symptoms' column (comma/semicolon
+separated or free text) or, as in dataset.csv, from every Symptom_* column;
+JSONL input from each object's 'symptoms'. An 'id' column or key is copied to
+the output, otherwise rows are numbered from 1. The output format follows the
+output file's extension. A row that is not valid JSON, or whose symptoms are
+not a string or a list of strings, gets an 'error' and no predictions instead
+of stopping the run.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import resource
+import sys
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+from medical_engine import MedicalAssistantEngine, symptom_input_error
+
+FORMATS = ('csv', 'jsonl')
+
+# One engine per worker process, loaded by _init_worker
+_engine = None
+
+
+def detect_format(path, default='jsonl'):
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension == 'json':
+        return 'jsonl'
+    return extension if extension in FORMATS else default
+
+
+def read_patients(path, input_format):
+    """Yield (id, symptoms, error) per input row without reading the whole file
+
+    `error` says why the row cannot be scored, or is None.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if input_format == 'jsonl':
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, None, f'invalid JSON: {e}'
+                    continue
+                if not isinstance(record, dict):
+                    yield number, None, 'row must be a JSON object'
+                    continue
+                symptoms = record.get('symptoms', [])
+                yield record.get('id', number), symptoms, symptom_input_error(symptoms)
+            return
+
+        reader = csv.DictReader(f)
+        columns = reader.fieldnames or []
+        symptom_columns = [c for c in columns if 'Symptom' in c]
+        for number, row in enumerate(reader, 1):
+            if 'symptoms' in row:
+                symptoms = row['symptoms'] or ''
+            else:
+                symptoms = [row[c].strip() for c in symptom_columns if row[c] and row[c].strip()]
+            yield row.get('id', number), symptoms, None
+
+
+def chunked(rows, size):
+    """Lists of up to `size` rows"""
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def output_header(output_format, top_n):
+    if output_format != 'csv':
+        return ''
+    columns = ['id']
+    for rank in range(1, top_n + 1):
+        columns += [f'disease_{rank}', f'confidence_{rank}']
+    columns += ['total_severity', 'severity_level', 'valid_symptoms', 'invalid_symptoms', 'error']
+    return ','.join(columns) + '\n'
+
+
+def score_chunk(engine, chunk, top_n, output_format):
+    """Score one chunk in a single vectorized call and render its output lines
+
+    Returns (text, rows, invalid rows). Extraction and normalization go
+    through the engine's caches, which pay off across chunks because intake
+    exports repeat the same few hundred symptom spellings. Severity comes
+    from the same feature matrix, one product with the engine's severity
+    vector. Rows read with an error are written with it and no predictions.
+    """
+    symptom_lists = [[] if error else engine.extract_symptoms(symptoms)[0] for _, symptoms, error in chunk]
+    X, valid_lists, invalid_lists = engine.vectorize_symptoms(symptom_lists)
+    probabilities, top_indices = engine.score_matrix(X, top_n)
+    totals, averages = engine.severity_scores(X)
+    levels = engine.severity_levels(averages)
+    classes = engine.classes_
+
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n') if output_format == 'csv' else None
+    for row, (patient_id, _, error) in enumerate(chunk):
+        predictions = []
+        total_severity = severity_level = None
+        if valid_lists[row]:
+            predictions = [
+                (str(classes[i]), round(float(probabilities[row, i]) * 100, 2)) for i in top_indices[row]
+            ]
+            total_severity, severity_level = int(totals[row]), str(levels[row])
+
+        if writer is not None:
+            cells = [patient_id]
+            for rank in range(top_n):
+                cells += list(predictions[rank]) if rank < len(predictions) else ['', '']
+            cells += [total_severity, severity_level]
+            cells += [';'.join(valid_lists[row]), ';'.join(map(str, invalid_lists[row])), error or '']
+            writer.writerow(cells)
+        else:
+            out.write(json.dumps({
+                'id': patient_id,
+                'predictions': [{'disease': d, 'confidence': c} for d, c in predictions],
+                'total_severity': total_severity,
+                'severity_level': severity_level,
+                'valid_symptoms': valid_lists[row],
+                'invalid_symptoms': invalid_lists[row],
+                'error': error,
+            }) + '\n')
+    return out.getvalue(), len(chunk), sum(1 for _, _, error in chunk if error)
+
+
+def _init_worker(model_path):
+    global _engine
+    # Bulk rows rarely repeat a whole combination, so no response cache or sessions
+    _engine = MedicalAssistantEngine(model_path, cache_size=0, session_limit=0)
+
+
+def _score_in_worker(chunk, top_n, output_format):
+    return score_chunk(_engine, chunk, top_n, output_format)
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident memory in MB (for RUSAGE_CHILDREN, of the largest child)"""
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def bulk_score(input_path, output_path, model_path=None, workers=None, chunk_size=2048, top_n=3,
+               input_format=None, output_format=None):
+    """Score every row of `input_path` into `output_path` and return a throughput report
+
+    `workers` defaults to the number of cores; with 1, chunks are scored in
+    this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    input_format = input_format or detect_format(input_path, default='csv')
+    output_format = output_format or detect_format(output_path)
+    chunks = chunked(read_patients(input_path, input_format), chunk_size)
+
+    rows = invalid = 0
+    start = time.perf_counter()
+    with open(output_path, 'w', newline='', encoding='utf-8') as out:
+        out.write(output_header(output_format, top_n))
+
+        if workers == 1:
+            engine = MedicalAssistantEngine(model_path, cache_size=0, session_limit=0)
+            start = time.perf_counter()
+            for chunk in chunks:
+                text, count, bad = score_chunk(engine, chunk, top_n, output_format)
+                out.write(text)
+                rows += count
+                invalid += bad
+        else:
+            with Pool(workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+                # A bounded window of chunks in flight keeps memory flat and output in order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.apply_async(_score_in_worker, (chunk, top_n, output_format)))
+                    if len(pending) >= 2 * workers:
+                        text, count, bad = pending.popleft().get()
+                        out.write(text)
+                        rows += count
+                        invalid += bad
+                while pending:
+                    text, count, bad = pending.popleft().get()
+                    out.write(text)
+                    rows += count
+                    invalid += bad
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'invalid_rows': invalid,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds else 0.0,
+        'workers': workers,
+        'chunk_size': chunk_size,
+        'peak_rss_mb': peak_rss_mb(),
+        'worker_peak_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN) if workers > 1 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a CSV or JSONL patient file with the trained model')
+    parser.add_argument('input', help='CSV or JSONL file of patients')
+    parser.add_argument('output', help='Where to write predictions (.csv or .jsonl)')
+    parser.add_argument('--model', default=None, help='Artifact directory or legacy pickle')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: number of cores)')
+    parser.add_argument('--chunk-size', type=int, default=2048, help='Rows per chunk (default 2048)')
+    parser.add_argument('--top', type=int, default=3, help='Predictions per row (default 3)')
+    parser.add_argument('--input-format', choices=FORMATS, help='Default: from the input file extension')
+    parser.add_argument('--output-format', choices=FORMATS, help='Default: from the output file extension')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ No such file: {args.input}")
+        sys.exit(1)
+
+    report = bulk_score(
+        args.input, args.output, args.model, args.workers, args.chunk_size, args.top,
+        args.input_format, args.output_format
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"✓ Scored {report['rows']} rows into {args.output} in {report['seconds']:.2f}s")
+    if report['invalid_rows']:
+        print(f"❌ {report['invalid_rows']} rows could not be scored (see their 'error' field)")
+    print(f"  throughput    {report['rows_per_second']:>10.0f} rows/s "
+          f"({report['workers']} workers, {report['chunk_size']} rows per chunk)")
+    print(f"  peak RSS      {report['peak_rss_mb']:>10.1f} MB")
+    if report['worker_peak_rss_mb'] is not None:
+        print(f"  worker peak   {report['worker_peak_rss_mb']:>10.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
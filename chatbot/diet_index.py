@@ -0,0 +1,109 @@
+"""
+Medical Assistance Chatbot - Diet Index
+Diet recommendations grouped by chronic disease and age, summarized once at startup
+"""
+
+import random
+from collections import Counter
+
+NUTRIENT_COLUMNS = {
+    'calories': 'Recommended_Calories',
+    'protein': 'Recommended_Protein',
+    'carbs': 'Recommended_Carbs',
+    'fats': 'Recommended_Fats',
+}
+
+AGE_BUCKET_SIZE = 10
+
+# Group key component meaning "any chronic disease" / "any age"
+ANY = '*'
+
+
+def age_bucket(age, bucket_size=AGE_BUCKET_SIZE):
+    """Start of the age bucket containing `age` (e.g. 47 -> 40)"""
+    return int(age) // bucket_size * bucket_size
+
+
+def diet_table_from_dataframe(df_diet):
+    """Column-wise diet rows: chronic disease (None if absent), age, meal plan, macros"""
+    return {
+        'chronic_disease': [d if isinstance(d, str) else None for d in df_diet['Chronic_Disease']],
+        'age': df_diet['Age'].to_numpy(),
+        'meal_plan': df_diet['Recommended_Meal_Plan'].astype(str).tolist(),
+        'nutrients': df_diet[list(NUTRIENT_COLUMNS.values())].to_numpy(),
+    }
+
+
+def _summarize(rows):
+    """Median macros and the most common meal plan of a group of rows"""
+    plans = Counter(row[0] for row in rows)
+    # Most common plan, ties broken alphabetically so the result is stable
+    meal_plan = min(plans, key=lambda plan: (-plans[plan], plan))
+
+    summary = {'meal_plan': meal_plan}
+    for i, key in enumerate(NUTRIENT_COLUMNS, start=1):
+        values = sorted(row[i] for row in rows)
+        mid = len(values) // 2
+        median = values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+        summary[key] = int(round(median))
+    return summary
+
+
+class DietIndex:
+    """O(1), deterministic diet lookups
+
+    Rows are grouped by Chronic_Disease (None for patients without one) and by
+    age bucket, with ANY standing for either dimension left open. Each group
+    keeps its median macros and most common meal plan, plus its raw rows for
+    callers that ask for a seeded sample instead.
+    """
+
+    def __init__(self, diet_table, bucket_size=AGE_BUCKET_SIZE):
+        self.bucket_size = bucket_size
+
+        diseases = diet_table['chronic_disease']
+        rows = {}
+        for disease, age, meal_plan, nutrients in zip(
+                diseases, diet_table['age'], diet_table['meal_plan'], diet_table['nutrients']):
+            row = (meal_plan,) + tuple(int(v) for v in nutrients)
+            bucket = age_bucket(age, bucket_size)
+            for key in ((disease, bucket), (disease, ANY), (ANY, bucket), (ANY, ANY)):
+                rows.setdefault(key, []).append(row)
+
+        self.rows = {key: tuple(group) for key, group in rows.items()}
+        self.summaries = {key: _summarize(group) for key, group in self.rows.items()}
+
+        # Lower-cased query -> Chronic_Disease value, filled lazily
+        self.chronic_diseases = sorted({d for d in diseases if d is not None})
+        self._resolved = {}
+
+    def resolve_disease(self, chronic_disease):
+        """Map a query onto a Chronic_Disease value by case-insensitive substring"""
+        query = chronic_disease.lower()
+        if query not in self._resolved:
+            self._resolved[query] = next(
+                (d for d in self.chronic_diseases if query in d.lower()), None
+            )
+        return self._resolved[query]
+
+    def recommend(self, chronic_disease=None, age=None, seed=None):
+        """Diet recommendation for a chronic disease and/or age
+
+        The most specific group with data wins: disease and age bucket, then
+        disease, then age bucket, then everyone. Without `seed` the group's
+        summary is returned; with one, a reproducible row of that group.
+        """
+        disease = self.resolve_disease(chronic_disease) if chronic_disease else None
+        disease = ANY if disease is None else disease
+        bucket = ANY if age is None else age_bucket(age, self.bucket_size)
+
+        candidates = [(disease, bucket), (disease, ANY), (ANY, bucket)]
+        key = next((k for k in candidates if k in self.rows), (ANY, ANY))
+
+        if seed is None:
+            return dict(self.summaries[key])
+
+        row = random.Random(seed).choice(self.rows[key])
+        recommendation = {'meal_plan': row[0]}
+        recommendation.update(zip(NUTRIENT_COLUMNS, row[1:]))
+        return recommendation
@@ -0,0 +1,149 @@
+"""
+Medical Assistance Chatbot - Fast Inference
+NumPy implementations of predict_proba that skip sklearn's per-call validation and dispatch
+
+ForestEngine walks the flattened node tables of a tree ensemble (see
+model_artifact.export_forest) for all trees at once. LinearEngine covers
+naive Bayes and multinomial logistic regression, whose class scores are one
+matrix product. build_engine picks whichever is fastest for a model;
+build_stored_engine builds the native ones from an artifact's arrays alone.
+"""
+
+import numpy as np
+
+from model_artifact import export_forest
+
+# Up to this many rows, gathering leaf values directly beats a sparse product
+SMALL_BATCH_ROWS = 8
+
+# Estimators whose exported node tables ForestEngine reproduces exactly
+FOREST_ESTIMATORS = ('RandomForestClassifier', 'ExtraTreesClassifier')
+
+
+class ForestEngine:
+    """Vectorized predict_proba for a random forest
+
+    Every row walks every tree at once: one gather per level over a
+    (rows x trees) array of node ids. Leaves point at themselves, so walking
+    the forest's full depth is always safe.
+    """
+
+    def __init__(self, forest, classes):
+        self.classes_ = np.asarray(classes)
+        self.threshold = np.asarray(forest['forest_threshold'])
+        self.value = np.asarray(forest['forest_value'])
+        self.roots = np.asarray(forest['forest_roots'], dtype=np.intp)
+        self.depth = int(np.asarray(forest['forest_depth'])[0])
+        # Leaves carry feature -1; any valid column works since both children are the leaf itself
+        feature = np.asarray(forest['forest_feature'])
+        self.feature = np.where(feature < 0, 0, feature).astype(np.intp)
+        # children[2 * node + went_right]
+        self.children = np.stack(
+            [np.asarray(forest['forest_left']), np.asarray(forest['forest_right'])], axis=1
+        ).ravel().astype(np.intp)
+
+    def leaves(self, X):
+        """Leaf node id reached in each tree, shape (rows, trees)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        flat = X.ravel()
+        row_offset = (np.arange(len(X)) * X.shape[1])[:, None]
+
+        node = np.repeat(self.roots[None, :], len(X), axis=0)
+        for _ in range(self.depth):
+            went_right = flat[row_offset + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + went_right]
+        return node
+
+    def predict_proba(self, X):
+        node = self.leaves(X)
+        if len(node) <= SMALL_BATCH_ROWS:
+            return self.value[node].sum(axis=1) / node.shape[1]
+
+        # Larger batches: sum leaf values as a sparse (rows x nodes) @ (nodes x classes) product
+        from scipy import sparse
+        hits = sparse.csr_matrix(
+            (np.ones(node.size), node.ravel(), np.arange(0, node.size + 1, node.shape[1])),
+            shape=(len(node), len(self.value))
+        )
+        return np.asarray(hits @ self.value) / node.shape[1]
+
+
+class LinearEngine:
+    """predict_proba as softmax(X @ weights + bias)
+
+    Naive Bayes joint log-likelihoods and multinomial logistic regression
+    scores are both linear in the features; see linear_parameters.
+    """
+
+    def __init__(self, weights, bias, classes):
+        self.classes_ = np.asarray(classes)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+
+    def predict_proba(self, X):
+        scores = np.asarray(X, dtype=np.float64) @ self.weights + self.bias
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+
+def linear_parameters(model):
+    """(weights, bias) such that softmax(X @ weights + bias) is predict_proba for 0/1 X
+
+    Returns None for estimators whose probabilities are not of that form.
+    """
+    name = type(model).__name__
+    if name == 'BernoulliNB':
+        log_p = model.feature_log_prob_
+        log_not_p = np.log1p(-np.exp(log_p))
+        return (log_p - log_not_p).T, model.class_log_prior_ + log_not_p.sum(axis=1)
+    if name == 'MultinomialNB':
+        return model.feature_log_prob_.T, model.class_log_prior_
+    if name == 'LogisticRegression' and len(model.classes_) > 2 and model.solver != 'liblinear':
+        return model.coef_.T, model.intercept_
+    return None
+
+
+class SklearnEngine:
+    """Fallback that defers to the estimator's own predict_proba"""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
+
+def build_engine(model, forest=None):
+    """Pick the fastest engine that supports `model`
+
+    `forest` is the node-table dict stored in the artifact (memory-mapped);
+    without it the tables are exported from the estimator. Tree ensembles
+    and linear models get a native engine; everything else, SVCs and
+    calibrated wrappers included, is fastest through its own predict_proba.
+    """
+    name = type(model).__name__
+    if name in FOREST_ESTIMATORS:
+        forest = forest or export_forest(model)
+        if forest is not None:
+            return ForestEngine(forest, model.classes_)
+    parameters = linear_parameters(model)
+    if parameters is not None:
+        return LinearEngine(*parameters, model.classes_)
+    return SklearnEngine(model)
+
+
+def build_stored_engine(estimator, classes, forest=None, linear=None):
+    """Native engine from the arrays an artifact stores, or None if it has none
+
+    Needs neither the fitted estimator nor sklearn: `estimator` is the
+    manifest's class name, `forest` the node tables and `linear` the
+    (weights, bias) pair written by model_artifact.save_artifact.
+    """
+    if forest is not None and estimator in FOREST_ESTIMATORS:
+        return ForestEngine(forest, classes)
+    if linear is not None:
+        return LinearEngine(*linear, classes)
+    return None
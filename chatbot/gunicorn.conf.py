@@ -0,0 +1,44 @@
+"""
+Medical Assistance Chatbot - Gunicorn Configuration
+Production serving: the model is loaded once in the master and shared by forked workers
+
+    gunicorn -c gunicorn.conf.py
+
+Environment overrides: MEDBOT_BIND, MEDBOT_WORKERS, MEDBOT_THREADS,
+MEDBOT_TIMEOUT, MEDBOT_MODEL_PATH (read by app.create_app),
+MEDBOT_RELOAD_INTERVAL (read by app.start_model_watcher) and
+MEDBOT_SESSION_DB (read by session_store.open_session_store). Sessions stay in
+the worker that started them unless MEDBOT_SESSION_DB names a SQLite file all
+workers share, so without it route each session to one worker.
+"""
+
+import gc
+import multiprocessing
+import os
+
+wsgi_app = 'app:create_app()'
+
+# Load the model before forking so workers share its pages copy-on-write
+preload_app = True
+
+bind = os.environ.get('MEDBOT_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('MEDBOT_WORKERS', min(multiprocessing.cpu_count(), 4)))
+threads = int(os.environ.get('MEDBOT_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('MEDBOT_TIMEOUT', 60))
+keepalive = 5
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is built and before any fork.
+    # Frozen objects are never scanned by the cyclic collector, so collections
+    # in the workers do not write to (and thereby copy) the model's pages.
+    gc.freeze()
+    server.log.info("Model preloaded; %d objects frozen for copy-on-write sharing", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    # The model watcher is a thread, and threads do not survive fork: each
+    # worker polls for new models itself and swaps them in without a restart
+    import app
+    app.start_model_watcher()
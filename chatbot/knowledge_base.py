@@ -0,0 +1,102 @@
+"""
+Medical Assistance Chatbot - Knowledge Base
+Read-only per-disease records (description, precautions, severity) for request-time lookups
+"""
+
+from types import MappingProxyType
+
+from symptom_index import build_severity_vector
+
+PRECAUTION_COLUMNS = ['Precaution_1', 'Precaution_2', 'Precaution_3', 'Precaution_4']
+
+
+class DiseaseRecord:
+    """Everything the API reports about one disease"""
+
+    __slots__ = ('disease', 'description', 'precautions', 'severity')
+
+    def __init__(self, disease, description=None, precautions=(), severity=None):
+        self.disease = disease
+        self.description = description
+        self.precautions = tuple(precautions)
+        self.severity = severity
+
+    def __repr__(self):
+        return f"DiseaseRecord({self.disease!r})"
+
+
+def build_knowledge_base(df_description, df_precaution, severity_weights=None, symptom_list=None,
+                         disease_symptom_index=None):
+    """Collapse the description/precaution tables into plain per-disease entries
+
+    Returns {disease: {'description', 'precautions', 'severity'}} with only
+    builtin types, so it pickles without pandas. Severity is the average
+    weight of the disease's symptoms, weighted by how often each is listed.
+    Weights come from build_severity_vector, so names are reconciled exactly
+    as for patient scoring; symptoms the severity table does not list are
+    left out rather than counted at the default, and severity is None when
+    the table covers none of the disease's symptoms.
+    """
+    import pandas as pd
+
+    entries = {}
+
+    def entry(disease):
+        return entries.setdefault(str(disease).strip(), {
+            'description': None,
+            'precautions': [],
+            'severity': None
+        })
+
+    for row in df_description.itertuples(index=False):
+        if pd.notna(row.Description):
+            entry(row.Disease)['description'] = str(row.Description)
+
+    columns = [col for col in PRECAUTION_COLUMNS if col in df_precaution.columns]
+    for _, row in df_precaution.iterrows():
+        entry(row['Disease'])['precautions'] = [
+            str(row[col]) for col in columns if pd.notna(row[col])
+        ]
+
+    if severity_weights is not None and symptom_list is not None and disease_symptom_index:
+        severity, report = build_severity_vector(severity_weights, symptom_list)
+        unlisted = set(report['missing'])
+        symptom_to_index = {symptom: i for i, symptom in enumerate(symptom_list) if symptom not in unlisted}
+        for disease, ranked in disease_symptom_index.items():
+            ranked = [(symptom_to_index[s], share) for s, share in ranked if s in symptom_to_index]
+            shares = sum(share for _, share in ranked)
+            if shares:
+                entry(disease)['severity'] = sum(share * float(severity[i]) for i, share in ranked) / shares
+
+    return entries
+
+
+class KnowledgeBase:
+    """Dict-backed disease lookups with no pandas on the request path
+
+    Names are matched exactly first and then with surrounding whitespace
+    stripped, which reconciles model labels such as 'Diabetes ' with the
+    description table's 'Diabetes'.
+    """
+
+    def __init__(self, entries, diseases=()):
+        records = {
+            disease: DiseaseRecord(disease, e['description'], e['precautions'], e['severity'])
+            for disease, e in entries.items()
+        }
+        for disease in diseases:
+            record = records.get(str(disease).strip())
+            if record is not None:
+                records.setdefault(str(disease), record)
+
+        self.records = MappingProxyType(records)
+
+    def get(self, disease):
+        """Return the DiseaseRecord for `disease`, or None"""
+        record = self.records.get(disease)
+        if record is None:
+            record = self.records.get(str(disease).strip())
+        return record
+
+    def __len__(self):
+        return len(self.records)
@@ -0,0 +1,133 @@
+"""
+Medical Assistance Chatbot - Load Test
+Fires concurrent /predict requests at a running server and reports latency percentiles
+
+    python load_test.py --url http://localhost:5000 --requests 2000 --concurrency 16
+
+Only the standard library is used, so it can run from any machine that can
+reach the server. Symptom combinations are sampled from dataset.csv.
+"""
+
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_symptom_pool(dataset_path='dataset/dataset.csv', distinct=200, seed=42):
+    """`distinct` random symptom subsets of real dataset records"""
+    with open(dataset_path, newline='', encoding='utf-8') as f:
+        records = [
+            [s.strip().replace('_', ' ') for s in row[1:] if s.strip()]
+            for row in csv.reader(f)
+        ][1:]
+    records = [symptoms for symptoms in records if symptoms]
+
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(distinct):
+        symptoms = rng.choice(records)
+        pool.append(rng.sample(symptoms, rng.randint(1, min(4, len(symptoms)))))
+    return pool
+
+
+def wait_until_ready(url, timeout=120.0):
+    """Poll /ready until the server reports a warm model"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'{url}/ready', timeout=5) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def post_predict(url, symptoms, timeout):
+    """One /predict call; returns (seconds, HTTP status or None on a connection error)"""
+    body = json.dumps({'symptoms': symptoms}).encode('utf-8')
+    req = urllib.request.Request(
+        f'{url}/predict', data=body, headers={'Content-Type': 'application/json'}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        status = None
+    return time.perf_counter() - start, status
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(q / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run(url, requests, concurrency, pool, timeout=30.0, seed=7):
+    rng = random.Random(seed)
+    workload = [rng.choice(pool) for _ in range(requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda symptoms: post_predict(url, symptoms, timeout), workload))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(seconds for seconds, status in results if status == 200)
+    errors = len(results) - len(latencies)
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p90_ms': percentile(latencies, 90) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test a running medical chatbot server')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--distinct', type=int, default=200, help='Distinct symptom combinations to sample')
+    parser.add_argument('--dataset', default='dataset/dataset.csv')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/')
+    if not wait_until_ready(url):
+        print(f"❌ {url}/ready did not report ready")
+        sys.exit(1)
+
+    pool = load_symptom_pool(args.dataset, args.distinct)
+    report = run(url, args.requests, args.concurrency, pool)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n{report['requests']} requests, concurrency {report['concurrency']}, "
+          f"{report['errors']} errors in {report['seconds']:.2f}s")
+    print(f"  throughput  {report['rps']:>9.1f} req/s")
+    for key in ('p50_ms', 'p90_ms', 'p99_ms', 'max_ms'):
+        print(f"  {key[:-3]:<10}{report[key]:>10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,703 @@
+"""
+Medical Assistance Chatbot - Engine
+The loaded model, its precomputed indexes and the vectorized predict path, shared by every front-end
+
+Importing this module stays cheap: pandas, scipy and flask are never
+imported here, and sklearn only loads when a model is unpickled.
+"""
+
+import re
+import time
+from bisect import bisect_right
+from functools import cached_property
+
+import numpy as np
+
+from diet_index import DietIndex
+from fast_inference import build_engine, build_stored_engine
+from knowledge_base import KnowledgeBase
+from metrics import StageTimer
+from posterior_table import PosteriorTable
+from model_artifact import load_model_data
+from response_cache import ResponseCache
+from session_store import DiagnosisSession, open_session_store
+from symptom_bits import pack_indices, pack_vector
+from symptom_extractor import SymptomExtractor
+from symptom_index import DEFAULT_SEVERITY, denial_weights, rank_by_information_gain, top_information_gain
+from symptom_normalizer import SymptomNormalizer
+
+# Upper bound on records accepted in one batch request
+MAX_BATCH_SIZE = 10000
+
+# Chronic_Disease groups of the diet dataset that a predicted disease can map to
+CHRONIC_DISEASES = ['Diabetes', 'Hypertension', 'Heart Disease', 'Obesity']
+
+# Average severity at which each level after the first starts
+SEVERITY_THRESHOLDS = (2, 3, 4)
+SEVERITY_LEVELS = ('LOW', 'MODERATE', 'HIGH', 'CRITICAL')
+
+
+def parse_symptom_input(symptoms):
+    """Accept a symptom list or a comma/semicolon separated string"""
+    if isinstance(symptoms, str):
+        symptoms = [s.strip() for s in re.split(r'[,;]', symptoms)]
+    return symptoms
+
+
+def symptom_input_error(symptoms, field='symptoms'):
+    """Why `symptoms` is not a string or a list of strings, or None if it is"""
+    if isinstance(symptoms, str):
+        return None
+    if isinstance(symptoms, list) and all(isinstance(s, str) for s in symptoms):
+        return None
+    return f'{field} must be a string or a list of strings'
+
+
+def batch_records_error(records):
+    """Why a /predict/batch records list is malformed, naming the first bad record, or None
+    
+    A record is symptom input (see symptom_input_error) or a dict whose
+    'symptoms' and optional 'ruled_out_symptoms' are.
+    """
+    for i, record in enumerate(records):
+        if isinstance(record, dict):
+            error = (symptom_input_error(record.get('symptoms', []))
+                     or symptom_input_error(record.get('ruled_out_symptoms', []), 'ruled_out_symptoms'))
+        elif isinstance(record, (str, list)):
+            error = symptom_input_error(record, 'a record')
+        else:
+            error = 'must be a string, a list of strings or an object with symptoms'
+        if error:
+            return f'Invalid record {i}: {error}'
+    return None
+
+
+class MedicalAssistantEngine:
+    """The loaded model and everything derived from it, behind one predict path
+    
+    Shared by the Flask API, the ASGI API, the CLI chatbot and the scripts.
+    predict_batch returns /predict-shaped response bodies; the smaller
+    methods (predict_disease, get_symptom_severity, get_suggested_symptoms,
+    ...) serve front-ends that lay results out themselves.
+    """
+    
+    # Loaded on first access and dropped by load_model
+    LAZY_PARTS = ('model', 'knowledge_base', 'diet_index')
+    
+    def __init__(self, model_path=None, cache_size=1024, cache_ttl=600.0, session_limit=10000,
+                 session_ttl=1800.0, sessions=None):
+        """Initialize the chatbot with trained model
+        
+        Pass another engine's `sessions` store to keep its open sessions,
+        e.g. when a new model version replaces it.
+        """
+        # Scored responses keyed on the recognized symptom set; see predict_batch
+        self.response_cache = ResponseCache(maxsize=cache_size, ttl=cache_ttl)
+        
+        # Iterative diagnoses in progress, in this process or shared by all workers; see start_session
+        self.sessions = sessions if sessions is not None else open_session_store(
+            maxsize=session_limit, ttl=session_ttl
+        )
+        
+        # Latency histogram per prediction stage (normalize, inference, suggestions, ...)
+        self.stages = StageTimer()
+        self.load_model(model_path)
+    
+    def load_model(self, model_path=None):
+        """Load a model artifact (or legacy pickle) and everything derived from it
+        
+        Only what prediction needs is loaded here; the estimator, knowledge
+        base and diet index follow on first access (see LAZY_PARTS).
+        """
+        start = time.perf_counter()
+        model_data = load_model_data(model_path)
+        self.model_data = model_data
+        for name in self.LAZY_PARTS:
+            self.__dict__.pop(name, None)
+        
+        self.symptom_list = model_data['symptom_list']
+        self.manifest = model_data['manifest']
+        self.classes_ = np.asarray(model_data['classes'], dtype=object)
+        self.estimator_name = model_data['estimator']
+        
+        # NumPy predict_proba for tree ensembles and linear models, straight from the stored
+        # arrays; other estimators are unpickled and go through sklearn
+        self.engine = build_stored_engine(
+            self.estimator_name, self.classes_, model_data['forest'], model_data['linear']
+        ) or build_engine(self.model)
+        
+        # Training patterns (and each less one symptom) answer from a precomputed table
+        self.posterior_table = None
+        if model_data['posterior_table'] is not None:
+            self.posterior_table = PosteriorTable(*model_data['posterior_table'], fallback=self.engine)
+            self.engine = self.posterior_table
+        
+        # Disease -> ranked symptoms, and P(symptom | disease) with rows aligned to classes_
+        self.disease_symptom_index = model_data['disease_symptom_index']
+        self.symptom_likelihood = model_data['symptom_likelihood']
+        self.symptom_to_index = {s: i for i, s in enumerate(self.symptom_list)}
+        self.normalizer = SymptomNormalizer(self.symptom_list)
+        self.extractor = SymptomExtractor(self.symptom_list, model_data['severity_weights'])
+        
+        # Severity weight per vocabulary symptom, aligned to the feature columns
+        self.severity = np.asarray(model_data['severity'], dtype=np.int32)
+        
+        # Cached responses belong to the previous model; open sessions are
+        # rebuilt for this one on their next round (see get_session)
+        self.response_cache.clear()
+        self.model_load_seconds = time.perf_counter() - start
+    
+    @cached_property
+    def model(self):
+        """The fitted sklearn estimator; unpickling it imports sklearn"""
+        return self.model_data['model']
+    
+    @cached_property
+    def knowledge_base(self):
+        """Description / precautions / severity per disease as plain dict lookups"""
+        return KnowledgeBase(self.model_data['knowledge_base'], self.classes_)
+    
+    @cached_property
+    def diet_index(self):
+        """Diet plans grouped by chronic disease and age bucket"""
+        return DietIndex(self.model_data['diet_table'])
+    
+    def warm_up(self, predictions=1):
+        """Run `predictions` predictions end to end, bypassing the response cache
+        
+        Touches the engine, normalizer, knowledge base, diet index and
+        suggestion ranking so the first real request does not pay for lazy
+        initialization. Each prediction uses the top symptoms of a different
+        disease.
+        """
+        symptom_lists = []
+        for disease in self.classes_[:max(predictions, 1)]:
+            symptoms = [s for s, _ in self.disease_symptom_index.get(str(disease), ())][:3]
+            symptom_lists.append(symptoms or self.symptom_list[:1])
+        probabilities, top_indices, valid_lists, _ = self.score_symptom_lists(symptom_lists, top_n=5)
+        for row in range(len(symptom_lists)):
+            self.score_response(probabilities[row], top_indices[row], valid_lists[row])
+        # /predict responses include a diet plan, so the diet index is loaded here too
+        self.get_diet_for_disease(self.classes_[top_indices[0][0]])
+    
+    def normalize_symptom(self, symptom):
+        """Normalize symptom name and find closest match"""
+        return self.normalizer.normalize(symptom)
+    
+    def extract_symptoms(self, symptoms):
+        """Turn patient input into (symptoms, denied) for the normalizer
+        
+        Each comma/semicolon separated chunk (or list item) is scanned for
+        symptom phrases, so 'headache and high fever since yesterday' yields
+        both symptoms, and negated mentions ('no cough') go to `denied`. A
+        chunk without any known phrase is kept as typed, and so are the other
+        words of a chunk that has some ('headache and hihg fevr' keeps 'hihg
+        fevr'), so misspellings still reach the fuzzy normalizer and unknown
+        terms are still reported.
+        """
+        found = []
+        denied = []
+        for chunk in parse_symptom_input(symptoms):
+            if not isinstance(chunk, str):
+                found.append(chunk)
+                continue
+            present, negated, unmatched = self.extractor.extract(chunk)
+            if present or negated:
+                found.extend(present)
+                denied.extend(negated)
+                for words, is_negated in unmatched:
+                    (denied if is_negated else found).append(words)
+            else:
+                found.append(chunk)
+        return found, denied
+    
+    def vectorize_symptoms(self, symptom_lists):
+        """Normalize several symptom lists and build one uint8 0/1 feature matrix for all of them"""
+        X = np.zeros((len(symptom_lists), len(self.symptom_list)), dtype=np.uint8)
+        valid_lists = []
+        invalid_lists = []
+        rows = []
+        cols = []
+        
+        for row, symptoms in enumerate(symptom_lists):
+            valid_symptoms = []
+            invalid_symptoms = []
+            for symptom in symptoms:
+                normalized = self.normalize_symptom(symptom)
+                if normalized in valid_symptoms:
+                    # Two spellings of one symptom: the feature is already set
+                    continue
+                if normalized:
+                    valid_symptoms.append(normalized)
+                    rows.append(row)
+                    cols.append(self.symptom_to_index[normalized])
+                else:
+                    invalid_symptoms.append(symptom)
+            valid_lists.append(valid_symptoms)
+            invalid_lists.append(invalid_symptoms)
+        
+        X[rows, cols] = 1
+        return X, valid_lists, invalid_lists
+    
+    def top_predictions(self, probabilities, top_n):
+        """Indices of the top_n classes per row, highest probability first"""
+        top_n = min(top_n, probabilities.shape[1])
+        top = np.argpartition(-probabilities, top_n - 1, axis=1)[:, :top_n]
+        order = np.argsort(-np.take_along_axis(probabilities, top, axis=1), axis=1, kind='stable')
+        return np.take_along_axis(top, order, axis=1)
+    
+    def score_symptom_lists(self, symptom_lists, top_n=3):
+        """Predict diseases for many symptom lists with a single predict_proba call
+        
+        Returns (probabilities, top_indices, valid_lists, invalid_lists). Rows
+        without any recognized symptom are not sent to the model; their
+        probabilities stay all-zero and their top_indices are meaningless.
+        """
+        X, valid_lists, invalid_lists = self.vectorize_symptoms(symptom_lists)
+        probabilities, top_indices = self.score_matrix(X, top_n)
+        return probabilities, top_indices, valid_lists, invalid_lists
+    
+    def score_matrix(self, X, top_n=3):
+        """(probabilities, top_indices) for a feature matrix, all-zero rows skipped as in score_symptom_lists"""
+        has_symptoms = X.any(axis=1)
+        
+        probabilities = np.zeros((len(X), len(self.classes_)))
+        if has_symptoms.any():
+            probabilities[has_symptoms] = self.engine.predict_proba(X[has_symptoms])
+        
+        return probabilities, self.top_predictions(probabilities, top_n)
+    
+    def severity_scores(self, X):
+        """(totals, averages) of the symptoms set in each row of a feature matrix
+        
+        One matrix-vector product over the aligned severity weights; rows
+        without symptoms average 0.
+        """
+        totals = X @ self.severity
+        counts = np.count_nonzero(X, axis=1)
+        averages = np.divide(totals, counts, out=np.zeros(len(totals)), where=counts > 0)
+        return totals, averages
+    
+    def format_predictions(self, probabilities, top_indices):
+        """Build the prediction entries for one scored row"""
+        predictions = []
+        
+        for idx in top_indices:
+            disease = self.classes_[idx]
+            confidence = probabilities[idx]
+            
+            predictions.append({
+                'disease': disease,
+                'confidence': float(confidence * 100),
+                'description': self.get_disease_description(disease),
+                'precautions': self.get_disease_precautions(disease)
+            })
+        
+        return predictions
+    
+    def predict_disease(self, symptoms, top_n=3):
+        """Predict disease based on symptoms"""
+        probabilities, top_indices, valid_lists, invalid_lists = self.score_symptom_lists([symptoms], top_n)
+        
+        if not valid_lists[0]:
+            return None, valid_lists[0], invalid_lists[0]
+        
+        predictions = self.format_predictions(probabilities[0], top_indices[0])
+        return predictions, valid_lists[0], invalid_lists[0]
+    
+    def predict_batch(self, records, top_n=5, timings=None):
+        """Predict many patients at once
+        
+        Each record is a symptom list, a comma/semicolon separated string, or a
+        dict with 'symptoms' and optional 'ruled_out_symptoms' and 'diet_seed';
+        free-text chunks go through extract_symptoms. Returns one
+        /predict-shaped response body per record, in order. Every stage feeds
+        self.stages; pass a dict as `timings` to also get this call's
+        milliseconds per stage.
+        """
+        stage = self.stages.time
+        symptom_lists = []
+        ruled_out_lists = []
+        diet_seeds = []
+        with stage('normalize', timings):
+            for record in records:
+                if isinstance(record, dict):
+                    symptoms, denied = self.extract_symptoms(record.get('symptoms', []))
+                    ruled_out_lists.append([*parse_symptom_input(record.get('ruled_out_symptoms', [])), *denied])
+                    diet_seeds.append(record.get('diet_seed'))
+                else:
+                    symptoms, denied = self.extract_symptoms(record)
+                    ruled_out_lists.append(denied)
+                    diet_seeds.append(None)
+                symptom_lists.append(symptoms)
+            
+            X, valid_lists, invalid_lists = self.vectorize_symptoms(symptom_lists)
+            ruled_out_sets = [self.normalize_ruled_out(ruled_out) for ruled_out in ruled_out_lists]
+        
+        # The scored part of a response depends only on the symptom set and the
+        # ruled-out set, so repeated combinations skip the model entirely
+        with stage('cache_lookup', timings):
+            bits = np.packbits(X, axis=1)
+            keys = [
+                self.response_key(bits[i].tobytes(), ruled_out_sets[i], top_n) if valid_lists[i] else None
+                for i in range(len(records))
+            ]
+            scored = [self.response_cache.get(key) if key is not None else None for key in keys]
+        
+        misses = [i for i, key in enumerate(keys) if key is not None and scored[i] is None]
+        if misses:
+            with stage('inference', timings):
+                probabilities = self.engine.predict_proba(X[misses])
+                top_indices = self.top_predictions(probabilities, top_n)
+            for row, i in enumerate(misses):
+                scored[i] = self.score_response(
+                    probabilities[row], top_indices[row], valid_lists[i], ruled_out_sets[i], timings
+                )
+                self.response_cache.put(keys[i], scored[i])
+        
+        return [
+            self.build_prediction_response(scored[i], valid_lists[i], invalid_lists[i], diet_seeds[i], timings)
+            for i in range(len(records))
+        ]
+    
+    def normalize_ruled_out(self, ruled_out):
+        """The recognized symptoms among ruled-out input, as a set of vocabulary names"""
+        return frozenset(n for n in (self.normalize_symptom(s) for s in ruled_out if s) if n)
+    
+    def response_key(self, symptom_bits, ruled_out, top_n):
+        """Order-independent cache key: (packed symptom bits, packed ruled-out bits, top_n)
+        
+        `symptom_bits` is a packed feature row (see symptom_bits) and
+        `ruled_out` a normalize_ruled_out set.
+        """
+        ruled_out_bits = pack_indices((self.symptom_to_index[s] for s in ruled_out), len(self.symptom_list))
+        return symptom_bits, ruled_out_bits, top_n
+    
+    def score_response(self, probabilities, top_indices, valid_symptoms, ruled_out=(), timings=None):
+        """The model-dependent part of a /predict response, shared by every request
+        with the same symptom set (see response_key)
+        
+        Severity details are kept per symptom so each request can list them in
+        its own order.
+        """
+        stage = self.stages.time
+        with stage('format', timings):
+            predictions = self.format_predictions(probabilities, top_indices)
+        
+        # Get severity
+        with stage('severity', timings):
+            severity_info = self.get_symptom_severity(valid_symptoms)
+            severity_info['symptom_details'] = {
+                detail['symptom']: detail for detail in severity_info['symptom_details']
+            }
+        
+        # Check if we have high confidence (>50%)
+        max_confidence = predictions[0]['confidence']
+        needs_more_symptoms = max_confidence < 50.0
+        
+        # Get suggested symptoms if confidence is low
+        suggested_symptoms = []
+        if needs_more_symptoms:
+            # Earlier suggestions the user did not pick are not asked about again
+            with stage('suggestions', timings):
+                suggested = self.get_suggested_symptoms(
+                    valid_symptoms, predictions[:3], ruled_out=sorted(ruled_out), probabilities=probabilities
+                )
+            suggested_symptoms = [s.replace('_', ' ').title() for s in suggested]
+        
+        return {
+            'severity': severity_info,
+            'predictions': predictions[:3],  # Return top 3
+            'needs_more_symptoms': needs_more_symptoms,
+            'max_confidence': max_confidence,
+            'suggested_symptoms': suggested_symptoms
+        }
+    
+    def build_prediction_response(self, scored, valid_symptoms, invalid_symptoms, diet_seed=None,
+                                  timings=None):
+        """Assemble the /predict response body for one patient from its scored part"""
+        if not valid_symptoms:
+            return {
+                'status': 'error',
+                'message': 'No valid symptoms recognized',
+                'invalid_symptoms': invalid_symptoms
+            }
+        
+        severity_info = dict(scored['severity'])
+        severity_info['symptom_details'] = [severity_info['symptom_details'][s] for s in valid_symptoms]
+        
+        # Get diet recommendation
+        with self.stages.time('diet', timings):
+            diet_rec = self.get_diet_for_disease(scored['predictions'][0]['disease'], seed=diet_seed)
+        
+        return {
+            'status': 'success',
+            'valid_symptoms': [s.replace('_', ' ').title() for s in valid_symptoms],
+            'invalid_symptoms': invalid_symptoms,
+            'severity': severity_info,
+            'predictions': scored['predictions'],
+            'needs_more_symptoms': scored['needs_more_symptoms'],
+            'max_confidence': scored['max_confidence'],
+            'suggested_symptoms': scored['suggested_symptoms'],
+            'diet_recommendation': diet_rec,
+            'disclaimer': 'This is an AI-based prediction for informational purposes only. Please consult a healthcare professional.'
+        }
+    
+    def start_session(self, symptoms, ruled_out=(), diet_seed=None, top_n=5, timings=None):
+        """Open a diagnosis session and score its first round
+        
+        Returns (session, response): the response is /predict-shaped plus
+        'session_id', 'round' and 'added_symptoms'. When no symptom is
+        recognized nothing is stored and session is None.
+        """
+        session = DiagnosisSession(self.symptom_list, len(self.classes_), diet_seed)
+        response = self.advance_session(session, symptoms, ruled_out, top_n, timings)
+        if response['status'] != 'success':
+            return None, response
+        
+        response['session_id'] = self.sessions.add(session)
+        return session, response
+    
+    def get_session(self, session_id):
+        """The stored session with this id, ready for update_session, or None
+        
+        A session stored by another worker process or built for another model
+        is rebuilt from its symptom names; one that names symptoms this
+        model does not know is deleted and None is returned.
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        # Under the lock a concurrent update_session never sees half-rebuilt arrays
+        with session.lock:
+            if session.vocabulary is self.symptom_list or self.rebuild_session(session):
+                return session
+        self.sessions.delete(session_id)
+        return None
+    
+    def rebuild_session(self, session):
+        """Recompute a session's arrays from its symptom names; False if a name is not in the vocabulary
+        
+        The caller holds session.lock.
+        """
+        reported = [self.symptom_to_index.get(s) for s in session.valid_symptoms]
+        denied = [self.symptom_to_index.get(s) for s in sorted(session.ruled_out)]
+        if None in reported or None in denied:
+            return False
+        
+        features = np.zeros(len(self.symptom_list), dtype=np.uint8)
+        features[reported] = 1
+        suggestable = np.ones(len(self.symptom_list), dtype=bool)
+        suggestable[reported + denied] = False
+        severity_details = {
+            s: {'symptom': s, 'severity': int(self.severity[i])} for s, i in zip(session.valid_symptoms, reported)
+        }
+        
+        session.vocabulary = self.symptom_list
+        session.features = features
+        session.suggestable = suggestable
+        session.denial_weights = (
+            denial_weights(self.symptom_likelihood, denied) if denied else np.ones(len(self.classes_))
+        )
+        session.severity_details = severity_details
+        session.total_severity = sum(d['severity'] for d in severity_details.values())
+        session.probabilities = None
+        return True
+    
+    def update_session(self, session, symptoms=(), ruled_out=(), top_n=5, timings=None):
+        """Add symptoms and/or ruled-out suggestions to a stored session and re-score it"""
+        with session.lock:
+            response = self.advance_session(session, symptoms, ruled_out, top_n, timings)
+            self.sessions.save(session)
+        
+        response['session_id'] = session.session_id
+        return response
+    
+    def advance_session(self, session, symptoms=(), ruled_out=(), top_n=5, timings=None):
+        """Apply one round of new symptoms and ruled-out suggestions to `session`
+        
+        Only the new tokens are normalized, the model runs again only when a
+        new symptom was recognized and the resulting combination is not in
+        the response cache, and ruled-out symptoms are folded into the
+        session's running denial weights instead of being re-applied from
+        scratch. The response covers the whole session, exactly as /predict
+        would for all of its symptoms and ruled-out symptoms at once;
+        'invalid_symptoms' and 'added_symptoms' cover this round only.
+        """
+        stage = self.stages.time
+        with stage('normalize', timings):
+            symptoms, denied_mentions = self.extract_symptoms(symptoms)
+            added = []
+            invalid_symptoms = []
+            for symptom in symptoms:
+                normalized = self.normalize_symptom(symptom)
+                if not normalized:
+                    invalid_symptoms.append(symptom)
+                    continue
+                idx = self.symptom_to_index[normalized]
+                if not session.features[idx]:
+                    session.features[idx] = 1
+                    session.suggestable[idx] = False
+                    session.valid_symptoms.append(normalized)
+                    added.append(normalized)
+            
+            denied = []
+            for symptom in [*parse_symptom_input(ruled_out), *denied_mentions]:
+                normalized = self.normalize_symptom(symptom) if symptom else None
+                if normalized and normalized not in session.ruled_out:
+                    session.ruled_out.add(normalized)
+                    idx = self.symptom_to_index[normalized]
+                    session.suggestable[idx] = False
+                    denied.append(idx)
+        
+        if not session.valid_symptoms:
+            return self.build_prediction_response(None, [], invalid_symptoms)
+        
+        with stage('severity', timings):
+            for symptom in added:
+                severity = int(self.severity[self.symptom_to_index[symptom]])
+                session.severity_details[symptom] = {'symptom': symptom, 'severity': severity}
+                session.total_severity += severity
+        
+        if added:
+            # Scored lazily: a response cache hit below needs no distribution
+            session.probabilities = None
+        if denied:
+            session.denial_weights *= denial_weights(self.symptom_likelihood, denied)
+        session.rounds += 1
+        
+        # Same key as predict_batch, so sessions and /predict share cached responses
+        with stage('cache_lookup', timings):
+            key = self.response_key(pack_vector(session.features), session.ruled_out, top_n)
+            scored = self.response_cache.get(key)
+        if scored is None:
+            scored = self.score_session(session, top_n, timings)
+            self.response_cache.put(key, scored)
+        
+        response = self.build_prediction_response(
+            scored, session.valid_symptoms, invalid_symptoms, session.diet_seed, timings
+        )
+        response['round'] = session.rounds
+        response['added_symptoms'] = [s.replace('_', ' ').title() for s in added]
+        return response
+    
+    def score_session(self, session, top_n=5, timings=None):
+        """The scored part of a session response (see score_response), from the session's state"""
+        stage = self.stages.time
+        if session.probabilities is None:
+            with stage('inference', timings):
+                session.probabilities = self.engine.predict_proba(session.features[None])[0]
+        
+        avg_severity = session.total_severity / len(session.valid_symptoms)
+        severity_info = {
+            'total_severity': int(session.total_severity),
+            'average_severity': float(avg_severity),
+            'symptom_details': dict(session.severity_details),
+            'severity_level': self.get_severity_level(avg_severity)
+        }
+        
+        with stage('format', timings):
+            top_indices = self.top_predictions(session.probabilities[None], top_n)[0]
+            predictions = self.format_predictions(session.probabilities, top_indices)
+        
+        max_confidence = predictions[0]['confidence']
+        needs_more_symptoms = max_confidence < 50.0
+        
+        suggested_symptoms = []
+        if needs_more_symptoms:
+            with stage('suggestions', timings):
+                order = top_information_gain(
+                    self.symptom_likelihood, session.probabilities * session.denial_weights, session.suggestable
+                )
+            suggested_symptoms = [self.symptom_list[i].replace('_', ' ').title() for i in order]
+        
+        return {
+            'severity': severity_info,
+            'predictions': predictions[:3],
+            'needs_more_symptoms': needs_more_symptoms,
+            'max_confidence': max_confidence,
+            'suggested_symptoms': suggested_symptoms
+        }
+    
+    def get_disease_description(self, disease):
+        """Get description of a disease"""
+        record = self.knowledge_base.get(disease)
+        if record is not None and record.description:
+            return record.description
+        return "Description not available."
+    
+    def get_disease_precautions(self, disease):
+        """Get precautions for a disease"""
+        record = self.knowledge_base.get(disease)
+        precautions = list(record.precautions) if record is not None else []
+        
+        return precautions if precautions else ["Consult a healthcare professional"]
+    
+    def get_symptom_severity(self, symptoms):
+        """Calculate severity score based on symptoms
+        
+        Weights are gathered from the aligned severity vector; a name outside
+        the vocabulary gets DEFAULT_SEVERITY.
+        """
+        indices = [self.symptom_to_index.get(symptom, -1) for symptom in symptoms]
+        weights = [int(self.severity[i]) if i >= 0 else DEFAULT_SEVERITY for i in indices]
+        symptom_severities = [
+            {'symptom': symptom, 'severity': severity} for symptom, severity in zip(symptoms, weights)
+        ]
+        
+        total_severity = sum(weights)
+        avg_severity = total_severity / len(symptoms) if symptoms else 0
+        
+        return {
+            'total_severity': int(total_severity),
+            'average_severity': float(avg_severity),
+            'symptom_details': symptom_severities,
+            'severity_level': self.get_severity_level(avg_severity)
+        }
+    
+    def get_severity_level(self, avg_severity):
+        """Classify severity level"""
+        return SEVERITY_LEVELS[bisect_right(SEVERITY_THRESHOLDS, avg_severity)]
+    
+    def severity_levels(self, averages):
+        """get_severity_level for an array of averages"""
+        return np.asarray(SEVERITY_LEVELS)[np.searchsorted(SEVERITY_THRESHOLDS, averages, side='right')]
+    
+    def get_diet_recommendation(self, chronic_disease=None, age=None, seed=None):
+        """Get diet recommendations based on health profile
+        
+        Returns the median plan of the matching group; pass `seed` for a
+        reproducible sample from that group instead.
+        """
+        return self.diet_index.recommend(chronic_disease=chronic_disease, age=age, seed=seed)
+    
+    def get_diet_for_disease(self, disease, seed=None):
+        """Diet recommendation for a predicted disease, via its chronic disease group if any"""
+        chronic_match = next((cd for cd in CHRONIC_DISEASES if cd.lower() in str(disease).lower()), None)
+        return self.get_diet_recommendation(chronic_disease=chronic_match, seed=seed)
+    
+    def get_disease_probabilities(self, symptoms):
+        """Get the full predict_proba distribution for already-normalized symptoms"""
+        symptom_vector = np.zeros((1, len(self.symptom_list)), dtype=np.uint8)
+        for symptom in symptoms:
+            idx = self.symptom_to_index.get(symptom)
+            if idx is not None:
+                symptom_vector[0, idx] = 1
+        
+        return self.engine.predict_proba(symptom_vector)[0]
+    
+    def get_suggested_symptoms(self, current_symptoms, top_predictions, max_suggestions=8, ruled_out=(),
+                               probabilities=None):
+        """Suggest the follow-up symptoms that best tell the likely diseases apart
+        
+        Symptoms are ranked by expected entropy reduction over the full predicted
+        distribution, which already covers `top_predictions`. `ruled_out` are
+        earlier suggestions the patient did not confirm. Pass `probabilities`
+        when the distribution for `current_symptoms` is already known.
+        """
+        if probabilities is None:
+            probabilities = self.get_disease_probabilities(current_symptoms)
+        return rank_by_information_gain(
+            self.symptom_likelihood, probabilities, self.symptom_list,
+            current_symptoms, ruled_out, max_suggestions
+        )
@@ -0,0 +1,149 @@
+"""
+Medical Assistance Chatbot - Metrics
+Thread-safe counters, histograms and per-stage timers, rendered as Prometheus text
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in milliseconds for per-stage and per-request latency
+LATENCY_BUCKETS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000]
+
+
+def power_of_two_buckets(upper):
+    """Bucket bounds 1, 2, 4, ... up to and including the first power >= upper"""
+    bounds = [1]
+    while bounds[-1] < upper:
+        bounds.append(bounds[-1] * 2)
+    return bounds
+
+
+class Histogram:
+    """Prometheus-style histogram: cumulative counts per upper bound, plus sum and count"""
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def snapshot(self):
+        """{'buckets': {bound: cumulative count, ..., '+Inf': count}, 'sum', 'count'}"""
+        with self._lock:
+            cumulative = {}
+            running = 0
+            for bound, count in zip(self.buckets, self.counts):
+                running += count
+                cumulative[str(bound)] = running
+            cumulative['+Inf'] = self.count
+            return {'buckets': cumulative, 'sum': self.sum, 'count': self.count}
+
+
+class LabeledCounter:
+    """Monotonic counts per label combination, e.g. (endpoint, status)"""
+
+    def __init__(self, label_names):
+        self.label_names = tuple(label_names)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.values)
+
+
+class StageTimer:
+    """One latency histogram per named stage of request handling
+
+    `time(stage, timings)` records the stage's duration in its histogram
+    and, when a dict is passed, also adds it to that dict so one request can
+    report its own breakdown.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, stage, ms, timings=None):
+        self.histogram(stage).observe(ms)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + ms
+
+    @contextmanager
+    def time(self, stage, timings=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000, timings)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in labels.values())
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusText:
+    """Builder for the Prometheus text exposition format (version 0.0.4)"""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self.lines = []
+        self._declared = set()
+
+    def declare(self, name, kind, help_text):
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f'# HELP {name} {help_text}')
+            self.lines.append(f'# TYPE {name} {kind}')
+
+    def sample(self, name, value, labels=None, kind='gauge', help_text=''):
+        self.declare(name, kind, help_text)
+        self.lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    def counter(self, name, counter, help_text):
+        self.declare(name, 'counter', help_text)
+        for labels, value in sorted(counter.snapshot().items()):
+            self.lines.append(f'{name}{_format_labels(dict(zip(counter.label_names, labels)))} {value}')
+
+    def histogram(self, name, histogram, labels=None, help_text=''):
+        self.declare(name, 'histogram', help_text)
+        labels = dict(labels or {})
+        snapshot = histogram.snapshot()
+        for bound, count in snapshot['buckets'].items():
+            self.lines.append(f'{name}_bucket{_format_labels(dict(labels, le=bound))} {count}')
+        self.lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(float(snapshot["sum"]))}')
+        self.lines.append(f'{name}_count{_format_labels(labels)} {snapshot["count"]}')
+
+    def render(self):
+        return '\n'.join(self.lines) + '\n'
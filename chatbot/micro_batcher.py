@@ -0,0 +1,137 @@
+"""
+Medical Assistance Chatbot - Micro-Batcher
+Coalesces concurrent single-record requests into one vectorized model call
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import Histogram, power_of_two_buckets
+
+
+class MicroBatcher:
+    """Queue requests and flush them to `score_batch` in small batches
+
+    A flush starts when the first request arrives and takes whatever else is
+    queued within `max_wait_ms`, up to `max_batch_size` records.
+    `score_batch(records)` must return one result per record in order; it
+    runs on `executor` so the event loop keeps accepting requests meanwhile.
+    Flushes run one at a time: the model sees a single caller at any moment.
+    If a batch raises, its records are retried one by one so only the
+    records that fail on their own get the exception.
+    """
+
+    def __init__(self, score_batch, max_batch_size=64, max_wait_ms=2.0, executor=None):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+
+        self.batch_sizes = Histogram(power_of_two_buckets(max_batch_size))
+        self.queue_depths = Histogram(power_of_two_buckets(max_batch_size * 4))
+        self.batches = 0
+        self.failed_batches = 0
+        self.failed_records = 0
+
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        """Start the flush loop on the running event loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, record):
+        """Score one record as part of the next batch"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _collect(self):
+        """Wait for a first request, then gather more until the batch is full or the window ends"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        self.queue_depths.observe(self._queue.qsize() + 1)
+
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            records = [record for record, _ in batch]
+            self.batches += 1
+            self.batch_sizes.observe(len(batch))
+
+            try:
+                results = await loop.run_in_executor(self.executor, self.score_batch, records)
+            except Exception as e:
+                self.failed_batches += 1
+                if len(batch) == 1:
+                    self._fail(batch[0][1], e)
+                    continue
+                results = await loop.run_in_executor(self.executor, self._score_each, records)
+
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    self._fail(future, result)
+                # The client may have disconnected and cancelled its future
+                elif not future.done():
+                    future.set_result(result)
+
+    def _score_each(self, records):
+        """score_batch one record at a time, with each record's exception in place of its result"""
+        results = []
+        for record in records:
+            try:
+                results.append(self.score_batch([record])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _fail(self, future, error):
+        self.failed_records += 1
+        if not future.done():
+            future.set_exception(error)
+
+    def stats(self):
+        """Batching counters and histograms for /health"""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'queue_depth': self.queue_depth,
+            'batches': self.batches,
+            'failed_batches': self.failed_batches,
+            'failed_records': self.failed_records,
+            'batch_size': self.batch_sizes.snapshot(),
+            'queue_depth_at_flush': self.queue_depths.snapshot(),
+        }
@@ -0,0 +1,376 @@
+"""
+Medical Assistance Chatbot - Model Artifact
+Versioned on-disk model format: JSON metadata plus memory-mappable .npy arrays
+
+Layout of an artifact root such as medical_chatbot_model/:
+
+    LATEST                      name of the current version directory
+    v20251015-120000/
+        manifest.json           format version, vocabulary, classes, file list
+        metadata.json           symptom index, knowledge base, severity weights
+        estimator.pkl           the fitted sklearn estimator
+        training_report.json    every candidate's accuracy and serving cost, and why the winner won
+        symptom_likelihood.npy  P(symptom | disease), classes x symptoms
+        severity.npy            severity weight per symptom, aligned to the vocabulary
+        forest_*.npy            flattened tree node tables (tree ensembles only)
+        linear_*.npy            class score weights and bias (naive Bayes, logistic regression)
+        posterior_*.npy         predict_proba of the training patterns, keyed by packed bits
+        diet_*.npy              diet rows as integer columns
+
+Numeric arrays are opened with mmap_mode='r', so workers forked from the same
+parent, or started separately on the same host, share their pages. Each part
+is loaded on first use (see LazyParts), and tree ensembles and linear models
+are served from their arrays, so a predictor never unpickles the estimator.
+"""
+
+import json
+import os
+import pickle
+import sys
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+from symptom_index import build_severity_vector
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+METADATA_FILE = 'metadata.json'
+ESTIMATOR_FILE = 'estimator.pkl'
+TRAINING_REPORT_FILE = 'training_report.json'
+LATEST_FILE = 'LATEST'
+
+DEFAULT_ARTIFACT_ROOT = 'medical_chatbot_model'
+LEGACY_MODEL_PATH = 'medical_chatbot_model.pkl'
+
+
+def default_model_path():
+    """The artifact directory if one has been trained, else the legacy pickle"""
+    if os.path.isdir(DEFAULT_ARTIFACT_ROOT):
+        return DEFAULT_ARTIFACT_ROOT
+    return LEGACY_MODEL_PATH
+
+
+def export_forest(model):
+    """Flatten a fitted tree ensemble into concatenated node tables
+
+    Returns a dict of arrays, or None when `model` is not a forest of
+    decision trees. Leaf values are normalized to class probabilities, so
+    averaging the reached leaves over all trees reproduces predict_proba.
+    """
+    trees = getattr(model, 'estimators_', None)
+    if trees is None or not all(hasattr(tree, 'tree_') for tree in np.ravel(trees)):
+        return None
+    if getattr(model, 'n_outputs_', 1) != 1 or np.ndim(trees) != 1:
+        return None
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        t = tree.tree_
+        is_leaf = t.children_left == -1
+        values = t.value[:, 0, :]
+        totals = values.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+
+        feature.append(np.where(is_leaf, -1, t.feature))
+        threshold.append(t.threshold)
+        # Leaves point at themselves, so a fixed number of steps is always safe
+        nodes = np.arange(t.node_count) + offset
+        left.append(np.where(is_leaf, nodes, t.children_left + offset))
+        right.append(np.where(is_leaf, nodes, t.children_right + offset))
+        value.append(values / totals)
+        roots.append(offset)
+        offset += t.node_count
+
+    return {
+        'forest_feature': np.concatenate(feature).astype(np.int32),
+        'forest_threshold': np.concatenate(threshold).astype(np.float64),
+        'forest_left': np.concatenate(left).astype(np.int32),
+        'forest_right': np.concatenate(right).astype(np.int32),
+        'forest_value': np.concatenate(value).astype(np.float64),
+        'forest_roots': np.asarray(roots, dtype=np.int32),
+        'forest_depth': np.asarray([max(tree.tree_.max_depth for tree in trees)], dtype=np.int32),
+    }
+
+
+def encode_diet_table(diet_table):
+    """Integer-code the diet columns; names go to the metadata"""
+    diseases = sorted({d for d in diet_table['chronic_disease'] if d is not None})
+    plans = sorted(set(diet_table['meal_plan']))
+    disease_codes = {d: i for i, d in enumerate(diseases)}
+    plan_codes = {p: i for i, p in enumerate(plans)}
+
+    arrays = {
+        'diet_disease': np.asarray(
+            [-1 if d is None else disease_codes[d] for d in diet_table['chronic_disease']], dtype=np.int16
+        ),
+        'diet_age': np.asarray(diet_table['age'], dtype=np.int16),
+        'diet_meal_plan': np.asarray([plan_codes[p] for p in diet_table['meal_plan']], dtype=np.int16),
+        'diet_nutrients': np.asarray(diet_table['nutrients'], dtype=np.int32),
+    }
+    return arrays, {'diseases': diseases, 'meal_plans': plans}
+
+
+def decode_diet_table(arrays, names):
+    """Inverse of encode_diet_table"""
+    diseases = names['diseases']
+    plans = names['meal_plans']
+    return {
+        'chronic_disease': [None if c < 0 else diseases[c] for c in arrays['diet_disease'].tolist()],
+        'age': arrays['diet_age'],
+        'meal_plan': [plans[c] for c in arrays['diet_meal_plan'].tolist()],
+        'nutrients': arrays['diet_nutrients'],
+    }
+
+
+def save_artifact(root, model, symptom_list, disease_symptom_index, knowledge_base,
+                  severity_weights, diet_table, symptom_likelihood, version=None, training_report=None,
+                  posterior_table=None):
+    """Write a new artifact version under `root` and point LATEST at it
+
+    `training_report`, if given, is stored as training_report.json with the
+    version's 'version' and 'created' added; `posterior_table` is a (keys,
+    probabilities) pair from posterior_table.build_posterior_table. Returns the path of the version
+    directory.
+    """
+    version = version or time.strftime('v%Y%m%d-%H%M%S')
+    version_dir = os.path.join(root, version)
+    os.makedirs(version_dir, exist_ok=False)
+
+    arrays = {
+        'symptom_likelihood': np.asarray(symptom_likelihood, dtype=np.float64),
+        'severity': build_severity_vector(severity_weights, symptom_list)[0],
+    }
+    arrays.update(export_forest(model) or {})
+    # Imported here: fast_inference imports this module
+    from fast_inference import linear_parameters
+    linear = linear_parameters(model)
+    if linear is not None:
+        arrays['linear_weights'], arrays['linear_bias'] = linear
+    if posterior_table is not None:
+        arrays['posterior_keys'] = np.asarray(posterior_table[0], dtype=np.uint8)
+        arrays['posterior_probabilities'] = np.asarray(posterior_table[1], dtype=np.float64)
+    diet_arrays, diet_names = encode_diet_table(diet_table)
+    arrays.update(diet_arrays)
+
+    for name, array in arrays.items():
+        np.save(os.path.join(version_dir, f'{name}.npy'), np.ascontiguousarray(array))
+
+    with open(os.path.join(version_dir, ESTIMATOR_FILE), 'wb') as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    metadata = {
+        'disease_symptom_index': disease_symptom_index,
+        'knowledge_base': knowledge_base,
+        'severity_weights': {k: int(v) for k, v in severity_weights.items()},
+        'diet_names': diet_names,
+    }
+    with open(os.path.join(version_dir, METADATA_FILE), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+
+    created = time.strftime('%Y-%m-%dT%H:%M:%S')
+    if training_report is not None:
+        with open(os.path.join(version_dir, TRAINING_REPORT_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'created': created, **training_report}, f, indent=2)
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'version': version,
+        'created': created,
+        'estimator': type(model).__name__,
+        'symptom_list': list(symptom_list),
+        'classes': [str(c) for c in model.classes_],
+        'arrays': sorted(arrays),
+    }
+    # The manifest goes last: a version directory without one is incomplete
+    with open(os.path.join(version_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    latest_tmp = os.path.join(root, LATEST_FILE + '.tmp')
+    with open(latest_tmp, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(latest_tmp, os.path.join(root, LATEST_FILE))
+
+    return version_dir
+
+
+def resolve_version_dir(path):
+    """Version directory for an artifact root (via LATEST) or a version path"""
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return path
+    latest = os.path.join(path, LATEST_FILE)
+    if os.path.exists(latest):
+        with open(latest, encoding='utf-8') as f:
+            return os.path.join(path, f.read().strip())
+    raise FileNotFoundError(f"No model artifact found in {path}")
+
+
+class LazyParts(Mapping):
+    """The model_data mapping of an artifact, with each part loaded on first access
+
+    Parts are independent: reading the classifier's arrays does not unpickle
+    the estimator (or import sklearn), and the diet table is only decoded
+    for the first diet recommendation.
+    """
+
+    def __init__(self, loaders):
+        self._loaders = loaders
+        self._values = {}
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            self._values[key] = self._loaders[key]()
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._loaders)
+
+    def __len__(self):
+        return len(self._loaders)
+
+    def loaded(self):
+        """Names of the parts loaded so far"""
+        return sorted(self._values)
+
+
+def load_artifact(path, mmap_mode='r'):
+    """Open an artifact directory as the model_data mapping the chatbots consume
+
+    Only the manifest is read here; see LazyParts.
+    """
+    version_dir = resolve_version_dir(path)
+
+    with open(os.path.join(version_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest['format_version'] > ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Artifact format {manifest['format_version']} is newer than supported "
+            f"({ARTIFACT_FORMAT_VERSION}); please upgrade the chatbot"
+        )
+
+    def array(name):
+        return np.load(os.path.join(version_dir, f'{name}.npy'), mmap_mode=mmap_mode)
+
+    def arrays(prefix):
+        return {name: array(name) for name in manifest['arrays'] if name.startswith(prefix)}
+
+    def read_metadata():
+        with open(os.path.join(version_dir, METADATA_FILE), encoding='utf-8') as f:
+            return json.load(f)
+
+    def read_estimator():
+        with open(os.path.join(version_dir, ESTIMATOR_FILE), 'rb') as f:
+            return pickle.load(f)
+
+    def read_disease_symptom_index():
+        # JSON turns the index's (symptom, share) tuples into lists
+        return {
+            disease: [tuple(pair) for pair in ranked]
+            for disease, ranked in parts['metadata']['disease_symptom_index'].items()
+        }
+
+    def read_linear():
+        linear = arrays('linear_')
+        return (linear['linear_weights'], linear['linear_bias']) if linear else None
+
+    def read_posterior_table():
+        table = arrays('posterior_')
+        return (table['posterior_keys'], table['posterior_probabilities']) if table else None
+
+    parts = LazyParts({
+        'manifest': lambda: manifest,
+        'symptom_list': lambda: manifest['symptom_list'],
+        'classes': lambda: manifest['classes'],
+        'estimator': lambda: manifest['estimator'],
+        'model': read_estimator,
+        'metadata': read_metadata,
+        'disease_symptom_index': read_disease_symptom_index,
+        'symptom_likelihood': lambda: array('symptom_likelihood'),
+        'forest': lambda: arrays('forest_') or None,
+        'linear': read_linear,
+        'posterior_table': read_posterior_table,
+        'knowledge_base': lambda: parts['metadata']['knowledge_base'],
+        'severity_weights': lambda: parts['metadata']['severity_weights'],
+        # Versions written before severity.npy get the same vector built at load
+        'severity': lambda: (
+            array('severity') if 'severity' in manifest['arrays']
+            else build_severity_vector(parts['severity_weights'], manifest['symptom_list'])[0]
+        ),
+        'diet_table': lambda: decode_diet_table(arrays('diet_'), parts['metadata']['diet_names']),
+    })
+    return parts
+
+
+def load_legacy_pickle(path, dataset_path='dataset/'):
+    """Load a pre-artifact pickle and derive whatever it lacks
+
+    Older pickles bundle the raw DataFrames; the indexes newer code expects
+    are built from them (and dataset.csv) once here.
+    """
+    import pandas as pd
+    from diet_index import diet_table_from_dataframe
+    from knowledge_base import build_knowledge_base
+    from symptom_index import build_disease_symptom_index, build_symptom_likelihood
+
+    with open(path, 'rb') as f:
+        model_data = pickle.load(f)
+
+    model = model_data['model']
+    symptom_list = model_data['symptom_list']
+
+    disease_symptom_index = model_data.get('disease_symptom_index')
+    if disease_symptom_index is None:
+        disease_symptom_index = build_disease_symptom_index(pd.read_csv(f'{dataset_path}dataset.csv'))
+
+    df_severity = model_data['df_severity']
+    severity_weights = dict(zip(df_severity['Symptom'], df_severity['weight'].astype(int)))
+
+    knowledge_base = model_data.get('knowledge_base')
+    if knowledge_base is None:
+        knowledge_base = build_knowledge_base(
+            model_data['df_description'], model_data['df_precaution'],
+            severity_weights, symptom_list, disease_symptom_index
+        )
+    return {
+        'manifest': None,
+        'model': model,
+        'symptom_list': symptom_list,
+        'classes': list(model.classes_),
+        'estimator': type(model).__name__,
+        'disease_symptom_index': disease_symptom_index,
+        'symptom_likelihood': build_symptom_likelihood(disease_symptom_index, model.classes_, symptom_list),
+        'forest': export_forest(model),
+        'linear': None,
+        'posterior_table': None,
+        'knowledge_base': knowledge_base,
+        'severity_weights': severity_weights,
+        'severity': build_severity_vector(severity_weights, symptom_list)[0],
+        'diet_table': diet_table_from_dataframe(model_data['df_diet']),
+    }
+
+
+def load_model_data(path=None, mmap_mode='r'):
+    """Load either an artifact directory or a legacy pickle"""
+    path = path or default_model_path()
+    if os.path.isdir(path):
+        return load_artifact(path, mmap_mode=mmap_mode)
+    return load_legacy_pickle(path)
+
+
+def convert_legacy_pickle(pickle_path, root, version=None):
+    """Rewrite a legacy pickle as an artifact version under `root`"""
+    model_data = load_legacy_pickle(pickle_path)
+    return save_artifact(
+        root, model_data['model'], model_data['symptom_list'], model_data['disease_symptom_index'],
+        model_data['knowledge_base'], model_data['severity_weights'], model_data['diet_table'],
+        model_data['symptom_likelihood'], version=version
+    )
+
+
+if __name__ == '__main__':
+    # python model_artifact.py [legacy.pkl] [artifact_root]
+    source = sys.argv[1] if len(sys.argv) > 1 else LEGACY_MODEL_PATH
+    target = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_ARTIFACT_ROOT
+    print(f"✓ Wrote {convert_legacy_pickle(source, target)}")
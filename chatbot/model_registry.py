@@ -0,0 +1,146 @@
+"""
+Medical Assistance Chatbot - Model Registry
+Watches the model on disk and hot-swaps a newly trained version into a running server
+"""
+
+import os
+import threading
+import time
+
+from medical_engine import MedicalAssistantEngine
+from model_artifact import LATEST_FILE, MANIFEST_FILE, default_model_path
+
+
+class ModelRegistry:
+    """Owns the active MedicalAssistantEngine and replaces it when the model changes
+
+    `path` is an artifact root (watched through its LATEST file), a single
+    version directory (never changes) or a legacy pickle (watched through
+    its mtime and size). A new model is loaded and warmed up with a few
+    predictions entirely off the request path, then becomes active with a
+    single reference assignment: requests that already hold the old engine
+    finish on it, later ones get the new one. `on_swap(engine)` is called
+    after every swap so front-ends can rebind their own reference. If a new
+    version fails to load, the old one keeps serving.
+
+    The new engine takes over the old one's session store, so open
+    diagnosis sessions continue on the new model (see
+    MedicalAssistantEngine.get_session). `engine_factory(path, sessions=...)`
+    receives that store, or None for the first load.
+    """
+
+    def __init__(self, path=None, on_swap=None, warm_up_predictions=8, engine_factory=MedicalAssistantEngine):
+        self.path = path or default_model_path()
+        self.on_swap = on_swap
+        self.warm_up_predictions = warm_up_predictions
+        self.engine_factory = engine_factory
+
+        self.engine = None
+        self.source = None
+        self.loaded_at = None
+        self.swaps = 0
+        self.failed_loads = 0
+        self.last_error = None
+
+        self.poll_interval = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    @property
+    def version(self):
+        """Manifest version of the active model ('legacy' for a pickle)"""
+        if self.engine is None:
+            return None
+        manifest = self.engine.manifest
+        return manifest['version'] if manifest else 'legacy'
+
+    def current_source(self):
+        """What is on disk now; a change means there is a new model to load"""
+        if os.path.isdir(self.path):
+            latest = os.path.join(self.path, LATEST_FILE)
+            if os.path.exists(os.path.join(self.path, MANIFEST_FILE)) or not os.path.exists(latest):
+                return self.path
+            with open(latest, encoding='utf-8') as f:
+                return f.read().strip()
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """Load and warm the model currently on disk, then swap it in"""
+        with self._load_lock:
+            source = self.current_source()
+            # Remembered before loading: a broken file is retried once it changes again
+            self.source = source
+            try:
+                sessions = self.engine.sessions if self.engine is not None else None
+                engine = self.engine_factory(self.path, sessions=sessions)
+                engine.warm_up(self.warm_up_predictions)
+            except Exception as e:
+                self.failed_loads += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+
+            if self.engine is not None:
+                self.swaps += 1
+            self.engine = engine
+            self.loaded_at = time.time()
+            self.last_error = None
+            if self.on_swap is not None:
+                self.on_swap(engine)
+            return engine
+
+    def check(self):
+        """Load the model on disk if it changed since the last load; True if it was swapped in"""
+        try:
+            changed = self.current_source() != self.source
+        except OSError:
+            # Mid-rename or briefly missing; look again at the next poll
+            return False
+        if not changed:
+            return False
+
+        previous = self.version
+        try:
+            self.load()
+        except Exception:
+            print(f"❌ Failed to load new model from {self.path}: {self.last_error}")
+            return False
+        print(f"✓ Model swapped: {previous} -> {self.version}")
+        return True
+
+    def start(self, poll_interval=10.0):
+        """Poll for new models every `poll_interval` seconds on a daemon thread
+
+        Threads do not survive fork(), so under gunicorn this is started in
+        each worker (see post_fork in gunicorn.conf.py).
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self.poll_interval = poll_interval
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def stats(self):
+        """Active version and reload counters for /health"""
+        return {
+            'path': self.path,
+            'active_version': self.version,
+            'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.loaded_at)) if self.loaded_at else None,
+            'swaps': self.swaps,
+            'failed_loads': self.failed_loads,
+            'last_error': self.last_error,
+            'watching': self._watcher is not None and self._watcher.is_alive(),
+            'poll_interval_seconds': self.poll_interval,
+        }
@@ -0,0 +1,87 @@
+"""
+Medical Assistance Chatbot - Posterior Table
+predict_proba precomputed for the training set's symptom patterns, looked up by their packed bits
+"""
+
+import threading
+
+import numpy as np
+
+from symptom_bits import unpack_rows
+
+
+def table_patterns(packed, n_symptoms):
+    """Packed keys of every distinct training pattern and of each with one symptom left out
+
+    A patient who reports all but one of a record's symptoms lands on a
+    leave-one-out key; empty patterns are never stored.
+    """
+    patterns = unpack_rows(np.unique(packed, axis=0), n_symptoms)
+    rows, columns = np.nonzero(patterns)
+    subsets = patterns[rows]
+    subsets[np.arange(len(rows)), columns] = 0
+
+    candidates = np.vstack([patterns, subsets])
+    candidates = candidates[candidates.any(axis=1)]
+    return np.unique(np.packbits(candidates, axis=1), axis=0)
+
+
+def build_posterior_table(engine, packed, n_symptoms):
+    """(keys, probabilities) for table_patterns, scored once by `engine`"""
+    keys = table_patterns(packed, n_symptoms)
+    return keys, engine.predict_proba(unpack_rows(keys, n_symptoms))
+
+
+class PosteriorTable:
+    """predict_proba engine that answers from a precomputed table and falls back to a model
+
+    `keys` are packed feature rows (see symptom_bits) and `probabilities`
+    the fallback engine's output for them, row for row; both may be
+    memory-mapped. Rows whose pattern is not in the table are scored by
+    `fallback` in one call.
+    """
+
+    def __init__(self, keys, probabilities, fallback):
+        self.index = {key.tobytes(): row for row, key in enumerate(keys)}
+        # A plain ndarray view of a memmap: same shared pages, without np.memmap's slow indexing
+        self.probabilities = np.asarray(probabilities)
+        self.fallback = fallback
+        self.classes_ = fallback.classes_
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.index)
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        # packbits sets a bit for every non-zero feature
+        rows = [self.index.get(key, -1) for key in map(bytes, np.packbits(X, axis=1))]
+        misses = rows.count(-1)
+        with self._lock:
+            self.hits += len(rows) - misses
+            self.misses += misses
+
+        if not misses:
+            return self.probabilities[rows]
+        if misses == len(rows):
+            return self.fallback.predict_proba(X)
+        rows = np.asarray(rows)
+        found = rows >= 0
+        out = np.empty((len(rows), self.probabilities.shape[1]))
+        out[found] = self.probabilities[rows[found]]
+        out[~found] = self.fallback.predict_proba(X[~found])
+        return out
+
+    def stats(self):
+        """Counters for /health"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.index),
+                'fallback': type(self.fallback).__name__,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,87 @@
+"""
+Medical Assistance Chatbot - Response Cache
+Bounded LRU cache with a time-to-live for per-symptom-set prediction results
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds
+
+    Keys must be hashable; the API uses the packed bits of the recognized
+    symptoms. Counters survive clear(), so they describe the whole process.
+    """
+
+    def __init__(self, maxsize=1024, ttl=600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value for `key`, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, value = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        """Remove `key` and return its value (None if absent or expired)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] <= self.clock():
+                return None
+            return entry[1]
+
+    def clear(self):
+        """Drop every entry, e.g. because a different model was loaded"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters for /health"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
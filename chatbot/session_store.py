@@ -0,0 +1,231 @@
+"""
+Medical Assistance Chatbot - Session Store
+Server-side state of iterative diagnoses, kept in a bounded store with an idle timeout
+
+Sessions live in this process (SessionStore) or, when MEDBOT_SESSION_DB
+names a SQLite file, in that file (SharedSessionStore), so that every
+worker process on the host can continue a session another one started.
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from response_cache import ResponseCache
+
+
+class DiagnosisSession:
+    """One patient's diagnosis as it grows over several rounds
+
+    Holds what a round would otherwise rebuild from the full symptom list:
+    the model's feature vector, the symptoms that can still be suggested,
+    the accumulated weight of ruled-out symptoms and the last distribution.
+    MedicalAssistantEngine.start_session / update_session maintain it; the
+    lock serializes concurrent updates of the same session.
+
+    The arrays are indexed by `vocabulary`, the symptom list they were
+    built for; state() is the part that does not depend on it, and
+    MedicalAssistantEngine.get_session rebuilds the rest when a session
+    comes from another process or an older model.
+    """
+
+    def __init__(self, vocabulary, n_classes, diet_seed=None):
+        self.session_id = None
+        self.diet_seed = diet_seed
+        self.rounds = 0
+        self.vocabulary = vocabulary
+        n_symptoms = len(vocabulary) if vocabulary is not None else 0
+
+        # The bitmask fed to the model, and the recognized symptoms in the order they were reported
+        self.features = np.zeros(n_symptoms, dtype=np.uint8)
+        self.valid_symptoms = []
+
+        # Normalized ruled-out symptoms and their combined P(no | disease)
+        self.ruled_out = set()
+        self.denial_weights = np.ones(n_classes)
+
+        # Symptoms that are neither reported nor ruled out, i.e. may still be suggested
+        self.suggestable = np.ones(n_symptoms, dtype=bool)
+
+        self.probabilities = None
+        self.severity_details = {}
+        self.total_severity = 0
+
+        self.lock = threading.Lock()
+
+    def state(self):
+        """The session as plain symptom names, independent of any model"""
+        return {
+            'diet_seed': self.diet_seed,
+            'rounds': self.rounds,
+            'valid_symptoms': list(self.valid_symptoms),
+            'ruled_out': sorted(self.ruled_out),
+        }
+
+    @classmethod
+    def from_state(cls, session_id, state):
+        """A session with no arrays yet; MedicalAssistantEngine.get_session builds them"""
+        session = cls(None, 0, state['diet_seed'])
+        session.session_id = session_id
+        session.rounds = state['rounds']
+        session.valid_symptoms = list(state['valid_symptoms'])
+        session.ruled_out = set(state['ruled_out'])
+        return session
+
+
+class SessionStore:
+    """Thread-safe store of DiagnosisSession objects by id
+
+    At most `maxsize` sessions are kept (least recently used go first) and a
+    session expires `ttl` seconds after its last save.
+    """
+
+    def __init__(self, maxsize=10000, ttl=1800.0, clock=time.monotonic):
+        self._sessions = ResponseCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self.created = 0
+
+    def add(self, session):
+        """Store a new session under a fresh unguessable id and return the id"""
+        session.session_id = secrets.token_urlsafe(16)
+        self._sessions.put(session.session_id, session)
+        self.created += 1
+        return session.session_id
+
+    def get(self, session_id):
+        """The live session with this id, or None if it is unknown or expired"""
+        return self._sessions.get(session_id)
+
+    def save(self, session):
+        """Restart the session's idle timeout after an update"""
+        self._sessions.put(session.session_id, session)
+
+    def delete(self, session_id):
+        return self._sessions.pop(session_id) is not None
+
+    def clear(self):
+        self._sessions.clear()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        """Counters for /health"""
+        stats = self._sessions.stats()
+        return {
+            'active': stats['size'],
+            'maxsize': stats['maxsize'],
+            'ttl_seconds': stats['ttl_seconds'],
+            'created': self.created,
+            'evictions': stats['evictions'],
+            'expirations': stats['expirations'],
+        }
+
+
+class SharedSessionStore:
+    """SessionStore kept in a SQLite file that every worker process on the host opens
+
+    Only DiagnosisSession.state() is stored, so a session read here has to
+    be rebuilt for the reading engine (see MedicalAssistantEngine.get_session).
+    Idle time is measured on the wall clock, which all processes share.
+    Updates of one session from two processes at once are not merged: the
+    later save wins. Each process and thread opens its own connection.
+    """
+
+    def __init__(self, path, maxsize=10000, ttl=1800.0, clock=time.time):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._local = threading.local()
+        self._execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY, state TEXT NOT NULL, touched REAL NOT NULL
+            )
+        """)
+        self._execute("CREATE INDEX IF NOT EXISTS sessions_touched ON sessions (touched)")
+
+    def _connection(self):
+        # Connections do not survive fork(): gunicorn workers open their own
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _execute(self, sql, parameters=()):
+        return self._connection().execute(sql, parameters)
+
+    def add(self, session):
+        """Store a new session under a fresh unguessable id and return the id"""
+        session.session_id = secrets.token_urlsafe(16)
+        now = self.clock()
+        self.expirations += self._execute("DELETE FROM sessions WHERE touched < ?", (now - self.ttl,)).rowcount
+        self._execute(
+            "INSERT INTO sessions (id, state, touched) VALUES (?, ?, ?)",
+            (session.session_id, json.dumps(session.state()), now)
+        )
+        self.created += 1
+
+        overflow = len(self) - self.maxsize
+        if overflow > 0:
+            self.evictions += self._execute(
+                "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY touched LIMIT ?)",
+                (overflow,)
+            ).rowcount
+        return session.session_id
+
+    def get(self, session_id):
+        """The stored session with this id (without arrays), or None if it is unknown or expired"""
+        row = self._execute(
+            "SELECT state FROM sessions WHERE id = ? AND touched >= ?", (session_id, self.clock() - self.ttl)
+        ).fetchone()
+        return DiagnosisSession.from_state(session_id, json.loads(row[0])) if row else None
+
+    def save(self, session):
+        """Store the session's new state and restart its idle timeout"""
+        self._execute(
+            "INSERT OR REPLACE INTO sessions (id, state, touched) VALUES (?, ?, ?)",
+            (session.session_id, json.dumps(session.state()), self.clock())
+        )
+
+    def delete(self, session_id):
+        return self._execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount > 0
+
+    def clear(self):
+        self._execute("DELETE FROM sessions")
+
+    def __len__(self):
+        return self._execute(
+            "SELECT COUNT(*) FROM sessions WHERE touched >= ?", (self.clock() - self.ttl,)
+        ).fetchone()[0]
+
+    def stats(self):
+        """Counters for /health; created, evictions and expirations count this process only"""
+        return {
+            'active': len(self),
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'created': self.created,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'path': self.path,
+        }
+
+
+def open_session_store(maxsize=10000, ttl=1800.0):
+    """SharedSessionStore on MEDBOT_SESSION_DB if it is set, else an in-process SessionStore"""
+    path = os.environ.get('MEDBOT_SESSION_DB')
+    if path and maxsize:
+        return SharedSessionStore(path, maxsize=maxsize, ttl=ttl)
+    return SessionStore(maxsize=maxsize, ttl=ttl)
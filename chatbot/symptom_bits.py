@@ -0,0 +1,68 @@
+"""
+Medical Assistance Chatbot - Symptom Bits
+Packed one-bit-per-symptom vectors for training storage, deduplication and cache keys
+"""
+
+import numpy as np
+
+
+def packed_width(n_symptoms):
+    """Bytes per packed row"""
+    return (n_symptoms + 7) // 8
+
+
+def pack_rows(X):
+    """Pack a 0/1 matrix (dense or scipy CSR) into uint8 rows of one bit per column
+
+    Column j of a row is bit 7 - j % 8 of byte j // 8, as np.packbits lays it out.
+    """
+    if hasattr(X, 'indptr'):
+        packed = np.zeros((X.shape[0], packed_width(X.shape[1])), dtype=np.uint8)
+        nonzero = X.data != 0
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))[nonzero]
+        columns = X.indices[nonzero]
+        np.bitwise_or.at(packed, (rows, columns >> 3), (0x80 >> (columns & 7)).astype(np.uint8))
+        return packed
+    return np.packbits(np.asarray(X) != 0, axis=1)
+
+
+def unpack_rows(packed, n_symptoms):
+    """The uint8 0/1 feature matrix the estimators are fit and scored on"""
+    return np.unpackbits(packed, axis=1, count=n_symptoms)
+
+
+def pack_indices(indices, n_symptoms):
+    """Packed bytes of a single row with the given symptom indices set; hashable, for cache keys"""
+    row = np.zeros(packed_width(n_symptoms), dtype=np.uint8)
+    indices = np.fromiter(indices, dtype=np.intp)
+    np.bitwise_or.at(row, indices >> 3, (0x80 >> (indices & 7)).astype(np.uint8))
+    return row.tobytes()
+
+
+def pack_vector(features):
+    """Packed bytes of one 0/1 feature vector"""
+    return np.packbits(np.asarray(features) != 0).tobytes()
+
+
+def deduplicate(packed, y):
+    """Collapse repeated (pattern, label) records
+
+    Returns (packed, y, counts) with one row per distinct pair, in order of
+    first appearance, and how many records each stood for; pass counts as
+    sample_weight to fit the same model as on the full data.
+    """
+    _, codes = np.unique(y, return_inverse=True)
+    keyed = np.hstack([packed, codes.astype('>u4').view(np.uint8).reshape(len(codes), 4)])
+    rows = np.ascontiguousarray(keyed).view(np.dtype((np.void, keyed.shape[1]))).ravel()
+    _, first, counts = np.unique(rows, return_index=True, return_counts=True)
+
+    order = np.argsort(first, kind='stable')
+    first = first[order]
+    return packed[first], np.asarray(y)[first], counts[order]
+
+
+def matrix_nbytes(X):
+    """Bytes held by a dense array or a scipy sparse matrix"""
+    if hasattr(X, 'indptr'):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return np.asarray(X).nbytes
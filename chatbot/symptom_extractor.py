@@ -0,0 +1,253 @@
+"""
+Medical Assistance Chatbot - Symptom Extractor
+Finds every symptom mentioned in free text in one pass of a compiled phrase matcher
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+
+from symptom_normalizer import symptom_key
+
+# Everyday wording for vocabulary symptoms; entries whose symptom the model
+# does not know are skipped when the extractor is built
+SYMPTOM_SYNONYMS = {
+    'abdominal_pain': ('abdominal ache', 'abdomen pain', 'abdomen ache'),
+    'acidity': ('heartburn', 'acid reflux'),
+    'back_pain': ('backache', 'back ache', 'sore back'),
+    'belly_pain': ('belly ache', 'tummy ache', 'tummy pain'),
+    'blurred_and_distorted_vision': ('blurred vision', 'blurry vision', 'distorted vision'),
+    'breathlessness': ('breathless', 'short of breath', 'shortness of breath', 'difficulty breathing',
+                       'trouble breathing'),
+    'chest_pain': ('chest ache', 'chest tightness'),
+    'chills': ('chilly', 'feeling cold'),
+    'constipation': ('constipated',),
+    'continuous_sneezing': ('sneezing', 'sneeze', 'keep sneezing'),
+    'cough': ('coughing',),
+    'dark_urine': ('dark pee',),
+    'depression': ('depressed',),
+    'diarrhoea': ('diarrhea', 'loose motion', 'loose stool', 'watery stool'),
+    'dizziness': ('dizzy', 'lightheaded', 'light headed'),
+    'fast_heart_rate': ('racing heart', 'rapid heartbeat', 'heart racing', 'fast heartbeat'),
+    'fatigue': ('tired', 'tiredness', 'exhausted', 'exhaustion', 'worn out'),
+    'headache': ('head ache', 'head pain', 'migraine'),
+    'high_fever': ('fever', 'feverish', 'high temperature'),
+    'anxiety': ('anxious',),
+    'indigestion': ('upset stomach',),
+    'irritability': ('irritable',),
+    'itching': ('itchy', 'itch', 'itchiness'),
+    'joint_pain': ('joint ache', 'aching joints', 'sore joints'),
+    'loss_of_appetite': ('no appetite', 'not hungry', 'poor appetite'),
+    'mild_fever': ('slight fever', 'low fever', 'low grade fever'),
+    'muscle_pain': ('muscle ache', 'aching muscles', 'sore muscles', 'body ache'),
+    'nausea': ('nauseous', 'nauseated', 'queasy', 'feel sick'),
+    'neck_pain': ('neck ache', 'sore neck'),
+    'palpitations': ('palpitation', 'heart pounding', 'pounding heart'),
+    'runny_nose': ('running nose', 'runny nostril'),
+    'skin_rash': ('rash', 'rashes'),
+    'stomach_pain': ('stomach ache', 'stomachache', 'sore stomach'),
+    'sweating': ('sweaty', 'sweat', 'night sweat'),
+    'throat_irritation': ('sore throat', 'scratchy throat', 'throat pain'),
+    'vomiting': ('vomit', 'throwing up', 'threw up', 'puking'),
+    'weakness_in_limbs': ('weak limbs', 'weak arms', 'weak legs'),
+    'weight_gain': ('gaining weight', 'gained weight'),
+    'weight_loss': ('losing weight', 'lost weight'),
+    'yellowing_of_eyes': ('yellow eyes',),
+    'yellowish_skin': ('yellow skin', 'jaundice'),
+}
+
+# A mention is negated when one of these appears in the few tokens before it
+NEGATION_CUES = frozenset({
+    'no', 'not', 'without', 'never', 'nor', 'deny', 'denies', 'denied', 'free',
+    'don', 'doesn', 'didn', 'haven', 'hasn', 'isn', 'aren',
+})
+
+# Words that end a negation's scope; punctuation ends it as well
+SCOPE_BREAKS = frozenset({'but', 'although', 'though', 'however', 'except'})
+
+NEGATION_WINDOW = 4
+
+# 'no cough or vomiting': a mention joined to a negated one by these is negated too
+NEGATION_LISTS = frozenset({'or', 'nor', ','})
+
+# Words of a complaint that are not part of a symptom ('I have ... since yesterday')
+FILLER_WORDS = frozenset({
+    'a', 'also', 'am', 'an', 'and', 'at', 'bad', 'badly', 'been', 'bit', 'child', 'day', 'days', 'feel',
+    'feeling', 'for', 'from', 'get', 'getting', 'got', 'had', 'has', 'have', 'having', 'i', 'im', 'in', 'is',
+    'it', 'little', 'lot', 'me', 'my', 'of', 'on', 'plus', 'really', 'since', 'so', 'some', 'the', 'three',
+    'to', 'today', 'too', 'two', 'very', 'week', 'weeks', 'with', 'worse', 'yesterday',
+})
+
+_TOKEN = re.compile(r'[a-z0-9]+|[.,;:!?]')
+
+
+def _fold(token):
+    """Fold simple plurals so 'headaches' and 'headache' share a token"""
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Lowercase word tokens, plus punctuation tokens that no phrase contains"""
+    return [_fold(token) for token in _words(text)]
+
+
+def _words(text):
+    return _TOKEN.findall(text.lower().replace('_', ' '))
+
+
+class PhraseMatcher:
+    """Aho–Corasick automaton over word tokens
+
+    Phrases are added as token sequences and compiled by build(); find()
+    then reports every occurrence of every phrase in a single left-to-right
+    pass over the input tokens, however many phrases there are.
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+    def add(self, tokens, value):
+        state = 0
+        for token in tokens:
+            nxt = self.goto[state].get(token)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][token] = nxt
+            state = nxt
+        self.output[state].append((len(tokens), value))
+
+    def build(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(token, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+        return self
+
+    def find(self, tokens):
+        """Every (start, end, value) occurrence, as token offsets"""
+        goto, fail, output = self.goto, self.fail, self.output
+        matches = []
+        state = 0
+        for i, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, value in output[state]:
+                matches.append((i + 1 - length, i + 1, value))
+        return matches
+
+
+class SymptomExtractor:
+    """Multi-label symptom extraction from free text, built once per loaded model
+
+    Phrases come from the model vocabulary, the severity table's names and
+    SYMPTOM_SYNONYMS, all mapped to vocabulary names. Overlapping matches
+    resolve leftmost-longest, so 'high fever' wins over 'fever'. Results are
+    cached per input string.
+    """
+
+    def __init__(self, symptom_list, severity_names=(), synonyms=SYMPTOM_SYNONYMS, cache_size=4096):
+        vocabulary = {symptom_key(symptom): symptom for symptom in symptom_list}
+
+        phrases = {}
+        for key, symptom in vocabulary.items():
+            phrases.setdefault(tuple(tokenize(key)), symptom)
+        for name in severity_names:
+            symptom = vocabulary.get(symptom_key(name))
+            if symptom is not None:
+                phrases.setdefault(tuple(tokenize(name)), symptom)
+        for canonical, variants in synonyms.items():
+            symptom = vocabulary.get(symptom_key(canonical))
+            if symptom is not None:
+                for variant in variants:
+                    phrases.setdefault(tuple(tokenize(variant)), symptom)
+
+        self.matcher = PhraseMatcher()
+        for tokens, symptom in phrases.items():
+            if tokens:
+                self.matcher.add(tokens, symptom)
+        self.matcher.build()
+        self.phrase_count = len(phrases)
+
+        self.extract = lru_cache(maxsize=cache_size)(self._extract)
+
+    def mentions(self, text):
+        """(symptom, negated) for each non-overlapping phrase match, in text order"""
+        return [(symptom, negated) for _, _, symptom, negated in self._spans(tokenize(text))]
+
+    def _spans(self, tokens):
+        """(start, end, symptom, negated) for each non-overlapping phrase match, in token order"""
+        matches = sorted(self.matcher.find(tokens), key=lambda m: (m[0], -m[1]))
+
+        found = []
+        covered = 0
+        for start, end, symptom in matches:
+            if start < covered:
+                continue
+            if found and found[-1][3] and covered < start and set(tokens[covered:start]) <= NEGATION_LISTS:
+                negated = True
+            else:
+                # The scope stops at the previous mention, whose own words ('no appetite') are no cue
+                negated = self._negated(tokens, max(start - NEGATION_WINDOW, covered), start)
+            found.append((start, end, symptom, negated))
+            covered = end
+        return found
+
+    def _negated(self, tokens, scope_start, start):
+        for token in reversed(tokens[scope_start:start]):
+            if token in NEGATION_CUES:
+                return True
+            if token in SCOPE_BREAKS or not token[0].isalnum():
+                return False
+        return False
+
+    def _extract(self, text):
+        """(present, negated, unmatched): symptom names in order of first mention
+
+        A symptom both affirmed and negated in the same text counts as present.
+        When some phrase matched, `unmatched` holds (words, negated) for each
+        run of other words that are not filler ('I have', 'since yesterday'),
+        so that 'headache and skin rsh' still hands 'skin rsh' on to the
+        fuzzy normalizer; it is empty when nothing matched.
+        """
+        words = _words(text)
+        tokens = [_fold(word) for word in words]
+        spans = self._spans(tokens)
+
+        present = []
+        negated = []
+        for _, _, symptom, is_negated in spans:
+            target = negated if is_negated else present
+            if symptom not in target:
+                target.append(symptom)
+
+        unmatched = []
+        if spans:
+            matched = {i for start, end, _, _ in spans for i in range(start, end)}
+            run = []
+            for i, token in enumerate(tokens + ['.']):
+                if i not in matched and token[0].isalnum() and words[i] not in FILLER_WORDS \
+                        and token not in NEGATION_CUES and token not in SCOPE_BREAKS:
+                    run.append(i)
+                    continue
+                if run:
+                    previous_end = max((end for _, end, _, _ in spans if end <= run[0]), default=0)
+                    scope_start = max(run[0] - NEGATION_WINDOW, previous_end)
+                    unmatched.append((' '.join(words[j] for j in run), self._negated(tokens, scope_start, run[0])))
+                    run = []
+        return tuple(present), tuple(s for s in negated if s not in present), tuple(unmatched)
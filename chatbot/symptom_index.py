@@ -0,0 +1,225 @@
+"""
+Medical Assistance Chatbot - Symptom Index
+Precomputed disease-to-symptom lookups shared by training and serving
+"""
+
+import numpy as np
+
+# Keeps a single noisy record from ruling a disease in or out completely
+LIKELIHOOD_FLOOR = 1e-3
+
+# Weight given to a vocabulary symptom the severity table does not list
+DEFAULT_SEVERITY = 2
+
+
+def get_symptom_columns(df_disease):
+    """Return the Symptom_* columns of the disease-symptom dataset"""
+    return [col for col in df_disease.columns if 'Symptom' in col]
+
+
+def symptom_mentions(df_disease):
+    """One (row, Symptom) pair per distinct symptom listed on each record
+
+    All Symptom_* columns are stacked, split on commas and stripped in one
+    pass; `row` is the positional row number in `df_disease`.
+    """
+    import pandas as pd
+
+    symptom_columns = get_symptom_columns(df_disease)
+
+    values = df_disease[symptom_columns].reset_index(drop=True)
+    mentions = values.stack().dropna().astype(str)
+    mentions = mentions.str.split(',').explode().str.strip()
+    mentions = mentions[mentions != '']
+
+    return pd.DataFrame({
+        'row': mentions.index.get_level_values(0),
+        'Symptom': mentions.to_numpy()
+    }).drop_duplicates()
+
+
+def encode_symptom_matrix(df_disease, symptom_list=None):
+    """One-hot encode the dataset's symptoms as a sparse matrix
+
+    Returns (X, y, symptom_list): X is a CSR matrix of 0/1 with one column
+    per symptom (sorted, unless `symptom_list` is given, in which case
+    unknown symptoms are dropped), and records without any symptom are left
+    out of both X and y.
+    """
+    import pandas as pd
+    from scipy import sparse
+
+    pairs = symptom_mentions(df_disease)
+    if symptom_list is None:
+        symptom_list = sorted(pairs['Symptom'].unique())
+
+    columns = pd.Index(symptom_list).get_indexer(pairs['Symptom'])
+    known = columns >= 0
+    rows = pairs['row'].to_numpy()[known]
+    columns = columns[known]
+
+    X = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, columns)),
+        shape=(len(df_disease), len(symptom_list))
+    )
+    has_symptoms = np.diff(X.indptr) > 0
+    y = df_disease['Disease'].to_numpy()[has_symptoms]
+    return X[has_symptoms], y, list(symptom_list)
+
+
+def build_disease_symptom_index(df_disease):
+    """Map each disease to its symptoms ranked by frequency
+
+    Returns {disease: [(symptom, share), ...]} where share is the fraction of
+    that disease's records listing the symptom, highest first.
+    """
+    pairs = symptom_mentions(df_disease)
+    pairs['Disease'] = df_disease['Disease'].to_numpy()[pairs['row']]
+
+    counts = pairs.groupby(['Disease', 'Symptom']).size()
+    totals = df_disease['Disease'].value_counts()
+
+    index = {}
+    for disease, disease_counts in counts.groupby(level=0):
+        ranked = sorted(
+            disease_counts.droplevel(0).items(),
+            key=lambda item: (-item[1], item[0])
+        )
+        index[disease] = [
+            (symptom, int(count) / int(totals[disease])) for symptom, count in ranked
+        ]
+
+    return index
+
+
+def build_symptom_likelihood(index, diseases, symptom_list):
+    """Build the disease x symptom matrix of P(symptom | disease)
+
+    Rows follow `diseases` (the model's classes_) and columns follow
+    `symptom_list`, so it lines up with predict_proba and the feature vector.
+    """
+    symptom_to_idx = {symptom: i for i, symptom in enumerate(symptom_list)}
+    likelihood = np.zeros((len(diseases), len(symptom_list)))
+
+    for row, disease in enumerate(diseases):
+        for symptom, share in index.get(disease, ()):
+            col = symptom_to_idx.get(symptom)
+            if col is not None:
+                likelihood[row, col] = share
+
+    return likelihood
+
+
+def build_severity_vector(severity_weights, symptom_list, default=DEFAULT_SEVERITY):
+    """Severity weights aligned to `symptom_list`, so a feature row's total is one dot product
+
+    Table names match vocabulary names exactly or, failing that, by
+    symptom_key, which reconciles spellings such as 'spotting_urination'
+    and 'spotting_ urination'. Returns (vector, report): vocabulary symptoms
+    the table does not cover get `default` and are listed under 'missing',
+    key matches under 'reconciled' ({vocabulary name: table name}) and table
+    entries outside the vocabulary under 'unused'.
+    """
+    from symptom_normalizer import symptom_key
+
+    by_key = {}
+    for name in severity_weights:
+        by_key.setdefault(symptom_key(name), name)
+
+    vector = np.full(len(symptom_list), default, dtype=np.int32)
+    used = set()
+    reconciled = {}
+    missing = []
+    for i, symptom in enumerate(symptom_list):
+        name = symptom if symptom in severity_weights else by_key.get(symptom_key(symptom))
+        if name is None:
+            missing.append(symptom)
+            continue
+        if name != symptom:
+            reconciled[symptom] = name
+        vector[i] = int(severity_weights[name])
+        used.add(name)
+
+    return vector, {
+        'matched': len(symptom_list) - len(missing),
+        'reconciled': reconciled,
+        'missing': missing,
+        'unused': sorted(set(severity_weights) - used),
+        'default': default,
+    }
+
+
+def _plogp(x):
+    """Elementwise x * log(x) with 0 * log(0) taken as 0"""
+    return np.where(x > 0, x * np.log(np.where(x > 0, x, 1.0)), 0.0)
+
+
+def expected_information_gain(likelihood, probabilities):
+    """Expected entropy reduction over diseases from asking about each symptom
+
+    `probabilities` is the current predict_proba distribution. Returns one
+    gain (in nats) per symptom column: the mutual information between the
+    disease and a yes/no answer about that symptom.
+    """
+    p = np.asarray(probabilities, dtype=float)
+    p = p / p.sum()
+    theta = np.clip(likelihood, LIKELIHOOD_FLOOR, 1.0 - LIKELIHOOD_FLOOR)
+
+    joint_yes = p[:, None] * theta
+    joint_no = p[:, None] - joint_yes
+    p_yes = joint_yes.sum(axis=0)
+    p_no = 1.0 - p_yes
+
+    h_disease = -_plogp(p).sum()
+    h_answer = -(_plogp(p_yes) + _plogp(p_no))
+    h_joint = -(_plogp(joint_yes) + _plogp(joint_no)).sum(axis=0)
+
+    return h_disease + h_answer - h_joint
+
+
+def denial_weights(likelihood, denied):
+    """Per-disease factor P(no to every `denied` symptom | disease)
+
+    `denied` are symptom column indices. Multiplying a distribution by the
+    result applies the ruled-out symptoms as negative evidence; the factors
+    of successive denials multiply, so they can be accumulated one at a time.
+    """
+    theta = np.clip(likelihood[:, list(denied)], LIKELIHOOD_FLOOR, 1.0 - LIKELIHOOD_FLOOR)
+    return np.prod(1.0 - theta, axis=1)
+
+
+def top_information_gain(likelihood, probabilities, allowed, max_suggestions=8):
+    """Column indices of the `max_suggestions` allowed symptoms with the highest gain
+
+    `allowed` is a boolean mask over symptom columns. Ties keep column order.
+    """
+    gain = expected_information_gain(likelihood, probabilities)
+    order = np.argsort(-gain, kind='stable')
+    order = order[allowed[order]]
+    return order[:max_suggestions]
+
+
+def rank_by_information_gain(likelihood, probabilities, symptom_list, current_symptoms,
+                             ruled_out=(), max_suggestions=8):
+    """Pick the follow-up symptoms that best separate the likely diseases
+
+    `ruled_out` holds symptoms the patient was already asked about and did not
+    confirm. They reweight the distribution as negative evidence and, like
+    the reported symptoms, are never suggested again. Ties keep symptom_list
+    order.
+    """
+    symptom_to_idx = {symptom: i for i, symptom in enumerate(symptom_list)}
+    p = np.asarray(probabilities, dtype=float)
+
+    denied = [symptom_to_idx[s] for s in ruled_out if s in symptom_to_idx]
+    if denied:
+        p = p * denial_weights(likelihood, denied)
+
+    allowed = np.ones(len(symptom_list), dtype=bool)
+    allowed[denied] = False
+    for symptom in current_symptoms:
+        for variant in (symptom, symptom.lower().replace(' ', '_')):
+            if variant in symptom_to_idx:
+                allowed[symptom_to_idx[variant]] = False
+
+    return [symptom_list[i] for i in top_information_gain(likelihood, p, allowed, max_suggestions)]
@@ -0,0 +1,110 @@
+"""
+Medical Assistance Chatbot - Symptom Normalizer
+Maps free-text symptom tokens onto the model's symptom vocabulary
+"""
+
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+
+def symptom_key(text):
+    """Canonical lookup key: lowercase words separated by single spaces
+
+    Underscores, punctuation and stray whitespace are folded away, so
+    'Skin Rash', 'skin_rash' and 'dischromic _patches' all produce the same
+    kind of key as their vocabulary entries.
+    """
+    text = re.sub(r'[^\w\s]', '', text.lower())
+    return ' '.join(text.replace('_', ' ').split())
+
+
+def _ngrams(key, n=3):
+    """Character n-grams of a key, padded so short words still produce some"""
+    padded = f' {key} '
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+class SymptomNormalizer:
+    """Compiled symptom lookup built once per loaded model
+
+    Exact and alias spellings resolve through a hash table. Anything else is
+    fuzzy matched, but only against the few vocabulary entries that share the
+    most character trigrams with the input. Results, including misses, are
+    kept in a bounded LRU cache keyed on the raw input.
+    """
+
+    def __init__(self, symptom_list, cutoff=0.7, max_candidates=12, cache_size=4096):
+        self.symptom_list = list(symptom_list)
+        self.cutoff = cutoff
+        self.max_candidates = max_candidates
+
+        # Alias table: every spelling variant of a symptom -> the canonical name
+        self.aliases = {}
+        for symptom in self.symptom_list:
+            for alias in (symptom, symptom.strip(), symptom_key(symptom),
+                          symptom_key(symptom).replace(' ', '_')):
+                self.aliases.setdefault(alias, symptom)
+
+        # Trigram -> vocabulary positions, used to shortlist fuzzy candidates
+        self.keys = [symptom_key(symptom) for symptom in self.symptom_list]
+        self.ngram_index = defaultdict(list)
+        for i, key in enumerate(self.keys):
+            for gram in _ngrams(key):
+                self.ngram_index[gram].append(i)
+
+        self._cached_normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def normalize(self, symptom):
+        """Return the canonical symptom name for `symptom`, or None"""
+        return self._cached_normalize(symptom)
+
+    def cache_info(self):
+        """Hit/miss statistics of the raw-input cache"""
+        return self._cached_normalize.cache_info()
+
+    def clear_cache(self):
+        self._cached_normalize.cache_clear()
+
+    def _normalize(self, symptom):
+        symptom = symptom.lower().strip()
+        match = self.aliases.get(symptom)
+        if match is not None:
+            return match
+
+        key = symptom_key(symptom)
+        match = self.aliases.get(key)
+        if match is not None:
+            return match
+
+        return self._fuzzy_match(key)
+
+    def _fuzzy_match(self, key):
+        """Best close match among the shortlisted candidates, like get_close_matches"""
+        if not key:
+            return None
+
+        overlap = defaultdict(int)
+        for gram in _ngrams(key):
+            for i in self.ngram_index.get(gram, ()):
+                overlap[i] += 1
+        if not overlap:
+            return None
+
+        shortlist = sorted(overlap, key=lambda i: (-overlap[i], i))[:self.max_candidates]
+
+        best_score = self.cutoff
+        best = None
+        matcher = SequenceMatcher()
+        matcher.set_seq2(key)
+        for i in shortlist:
+            matcher.set_seq1(self.keys[i])
+            if (matcher.real_quick_ratio() >= best_score and
+                    matcher.quick_ratio() >= best_score):
+                score = matcher.ratio()
+                if score > best_score or (best is None and score >= best_score):
+                    best_score = score
+                    best = self.symptom_list[i]
+
+        return best
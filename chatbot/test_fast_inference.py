@@ -0,0 +1,90 @@
+"""
+Medical Assistance Chatbot - Inference Engine Tests
+The NumPy engines and the posterior table must reproduce sklearn's predict_proba
+
+    python -m pytest test_fast_inference.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import BernoulliNB, MultinomialNB
+
+from fast_inference import ForestEngine, LinearEngine, build_engine, build_stored_engine, linear_parameters
+from model_artifact import export_forest
+from posterior_table import PosteriorTable, build_posterior_table
+from symptom_bits import pack_rows
+from symptom_index import encode_symptom_matrix
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dataset', 'dataset.csv')
+
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(scope='module')
+def training_data():
+    X, y, symptom_list = encode_symptom_matrix(pd.read_csv(DATASET))
+    return X.toarray().astype(np.uint8), y, symptom_list
+
+
+@pytest.fixture(scope='module')
+def requests(training_data):
+    """Random non-empty subsets of training records, as patients report them"""
+    X, _, _ = training_data
+    rng = np.random.default_rng(7)
+    rows = X[rng.choice(len(X), size=512)].copy()
+    for row in rows:
+        present = np.flatnonzero(row)
+        row[rng.choice(present, size=rng.integers(0, len(present)), replace=False)] = 0
+    return rows
+
+
+@pytest.mark.parametrize('model, engine_type', [
+    (BernoulliNB(), LinearEngine),
+    (MultinomialNB(), LinearEngine),
+    (LogisticRegression(max_iter=1000), LinearEngine),
+    (RandomForestClassifier(n_estimators=20, random_state=42), ForestEngine),
+])
+def test_engine_matches_sklearn(training_data, requests, model, engine_type):
+    X, y, _ = training_data
+    model.fit(X, y)
+
+    engine = build_engine(model)
+    assert isinstance(engine, engine_type)
+    assert list(engine.classes_) == list(model.classes_)
+    np.testing.assert_allclose(engine.predict_proba(requests), model.predict_proba(requests), rtol=0, atol=TOLERANCE)
+    np.testing.assert_allclose(engine.predict_proba(requests[:1]), model.predict_proba(requests[:1]),
+                               rtol=0, atol=TOLERANCE)
+
+
+def test_stored_engines_match_sklearn(training_data, requests):
+    """Engines rebuilt from artifact arrays alone, without the estimator"""
+    X, y, _ = training_data
+    forest = RandomForestClassifier(n_estimators=20, random_state=42).fit(X, y)
+    linear = MultinomialNB().fit(X, y)
+
+    stored = [
+        (forest, build_stored_engine('RandomForestClassifier', forest.classes_, forest=export_forest(forest))),
+        (linear, build_stored_engine('MultinomialNB', linear.classes_, linear=linear_parameters(linear))),
+    ]
+    for model, engine in stored:
+        np.testing.assert_allclose(engine.predict_proba(requests), model.predict_proba(requests),
+                                   rtol=0, atol=TOLERANCE)
+
+
+def test_posterior_table_matches_its_fallback(training_data, requests):
+    X, y, symptom_list = training_data
+    engine = build_engine(MultinomialNB().fit(X, y))
+    keys, probabilities = build_posterior_table(engine, pack_rows(X), len(symptom_list))
+    table = PosteriorTable(keys, probabilities, fallback=engine)
+
+    # Full records are all hits; random subsets mix hits and misses
+    for rows in (X[:64], requests):
+        np.testing.assert_allclose(table.predict_proba(rows), engine.predict_proba(rows), rtol=0, atol=TOLERANCE)
+    stats = table.stats()
+    assert stats['hits'] >= 64 and stats['misses'] > 0
+    assert stats['hits'] + stats['misses'] == 64 + len(requests)
@@ -0,0 +1,131 @@
+"""
+Medical Assistance Chatbot - Engine Tests
+Caches, sessions and batch paths must answer exactly as the uncached single-request path
+
+    python -m pytest test_medical_engine.py
+
+Needs a trained model: the artifact directory or the legacy pickle next to this file.
+"""
+
+import os
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from medical_engine import MedicalAssistantEngine
+from model_artifact import DEFAULT_ARTIFACT_ROOT, LEGACY_MODEL_PATH
+from response_cache import ResponseCache
+from session_store import SessionStore, SharedSessionStore
+from symptom_index import get_symptom_columns
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Fields a session adds to the /predict body, or that cover only its latest round
+SESSION_FIELDS = ('session_id', 'round', 'added_symptoms', 'invalid_symptoms')
+
+
+@pytest.fixture(scope='module')
+def engine():
+    for path in (DEFAULT_ARTIFACT_ROOT, LEGACY_MODEL_PATH):
+        path = os.path.join(HERE, path)
+        if os.path.exists(path):
+            cwd = os.getcwd()
+            # The legacy pickle reads dataset/ relative to the working directory
+            os.chdir(HERE)
+            try:
+                return MedicalAssistantEngine(path, sessions=SessionStore())
+            finally:
+                os.chdir(cwd)
+    pytest.skip('no trained model; run train_model.py first')
+
+
+@pytest.fixture(scope='module')
+def patients():
+    """Distinct symptom lists of the dataset's records"""
+    df = pd.read_csv(os.path.join(HERE, 'dataset', 'dataset.csv'))
+    records = {
+        tuple(sorted(str(s).strip() for s in row if pd.notna(s) and str(s).strip()))
+        for row in df[get_symptom_columns(df)].itertuples(index=False)
+    }
+    return [list(r) for r in sorted(records) if r]
+
+
+def symptom_subsets(patients, count, seed=42):
+    rng = random.Random(seed)
+    return [rng.sample(s, rng.randint(1, len(s))) for s in rng.sample(patients, count)]
+
+
+def test_served_engine_matches_estimator(engine, patients):
+    X, _, _ = engine.vectorize_symptoms(symptom_subsets(patients, 256))
+    np.testing.assert_allclose(engine.engine.predict_proba(X), engine.model.predict_proba(X), rtol=0, atol=1e-9)
+
+
+def test_severity_totals_match_per_symptom_lookups(engine, patients):
+    X, valid_lists, _ = engine.vectorize_symptoms(symptom_subsets(patients, 256))
+    totals, _ = engine.severity_scores(X)
+    assert [engine.get_symptom_severity(valid)['total_severity'] for valid in valid_lists] == list(totals)
+
+
+def test_response_cache_returns_the_uncached_response(engine, patients):
+    records = [{'symptoms': s, 'diet_seed': 1} for s in symptom_subsets(patients, 50)]
+    # The same symptoms in another order and spelling share a cache entry
+    shuffled = [{'symptoms': [s.replace('_', ' ') for s in reversed(r['symptoms'])], 'diet_seed': 1} for r in records]
+    cache = engine.response_cache
+    try:
+        engine.response_cache = ResponseCache(maxsize=0)
+        expected = engine.predict_batch(records), engine.predict_batch(shuffled)
+
+        engine.response_cache = ResponseCache()
+        cold = engine.predict_batch(records)
+        warm = engine.predict_batch(shuffled)
+        assert engine.response_cache.hits == len(records)
+    finally:
+        engine.response_cache = cache
+
+    assert (cold, warm) == expected
+
+
+def session_rounds(patients, count=40, seed=7):
+    """(first symptoms, [(added, ruled out), ...]) drawn from dataset records"""
+    rng = random.Random(seed)
+    scripts = []
+    for symptoms in rng.sample([p for p in patients if len(p) >= 4], count):
+        symptoms = rng.sample(symptoms, len(symptoms))
+        others = rng.sample([s for p in rng.sample(patients, 3) for s in p if s not in symptoms], 2)
+        scripts.append((symptoms[:1], [(symptoms[1:3], others[:1]), (symptoms[3:4], others[1:])]))
+    return scripts
+
+
+@pytest.mark.parametrize('store', ['in-process', 'sqlite'])
+def test_session_rounds_match_predict(engine, patients, tmp_path, store):
+    """Every round answers as /predict would for the session's symptoms and ruled-out symptoms so far"""
+    sessions = engine.sessions
+    engine.sessions = SessionStore() if store == 'in-process' else SharedSessionStore(str(tmp_path / 's.sqlite3'))
+    try:
+        for first, rounds in session_rounds(patients):
+            session, response = engine.start_session(first, diet_seed=3)
+            symptoms, ruled_out = list(first), []
+            for added, denied in rounds:
+                # Looked up by id, as the /session handler does; the SQLite store rebuilds it
+                session = engine.get_session(session.session_id)
+                response = engine.update_session(session, added, denied)
+                symptoms += added
+                ruled_out += denied
+
+                expected, = engine.predict_batch(
+                    [{'symptoms': symptoms, 'ruled_out_symptoms': ruled_out, 'diet_seed': 3}]
+                )
+                got = {k: v for k, v in response.items() if k not in SESSION_FIELDS}
+                assert got == {k: v for k, v in expected.items() if k not in SESSION_FIELDS}
+    finally:
+        engine.sessions = sessions
+
+
+def test_extract_symptoms_keeps_unmatched_words(engine):
+    found, denied = engine.extract_symptoms('headache and hihg fevr since yesterday')
+    assert found == ['headache', 'hihg fevr'] and denied == []
+    response, = engine.predict_batch(['headache and hihg fevr, xyzzy'])
+    assert response['valid_symptoms'] == ['Headache', 'High Fever']
+    assert response['invalid_symptoms'] == ['xyzzy']
@@ -7,26 +7,177 @@ and integrates multiple medical datasets for comprehensive assistance.
 import pandas as pd
 import numpy as np
 import pickle
+import time
 import warnings
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import LabelEncoder
+from contextlib import contextmanager
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from sklearn.naive_bayes import MultinomialNB
-import re
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report, log_loss
+from sklearn.naive_bayes import BernoulliNB, MultinomialNB
+from diet_index import diet_table_from_dataframe
+from fast_inference import build_engine
+from knowledge_base import build_knowledge_base
+from model_artifact import DEFAULT_ARTIFACT_ROOT, save_artifact
+from posterior_table import PosteriorTable, build_posterior_table
+from symptom_bits import deduplicate, matrix_nbytes, pack_rows, unpack_rows
+from symptom_index import (
+    build_disease_symptom_index, build_severity_vector, build_symptom_likelihood, encode_symptom_matrix
+)
 
 warnings.filterwarnings('ignore')
 
+
+def _fit_and_score(model, X_train, y_train, w_train, X_eval, y_eval, w_eval):
+    """Fit one candidate on one split; runs in a joblib worker
+    
+    Rows are distinct symptom patterns and the weights are how many records
+    each stands for, so fit and accuracy match the full duplicated data.
+    """
+    start = time.perf_counter()
+    model.fit(X_train, y_train, sample_weight=w_train)
+    accuracy = accuracy_score(y_eval, model.predict(X_eval), sample_weight=w_eval)
+    return model, accuracy, time.perf_counter() - start
+
+
+def _ms_per_call(fn, X, min_calls=20, min_seconds=0.2):
+    """Mean milliseconds per fn(X), after one warm-up call"""
+    fn(X)
+    calls = 0
+    start = time.perf_counter()
+    while calls < min_calls or time.perf_counter() - start < min_seconds:
+        fn(X)
+        calls += 1
+    return (time.perf_counter() - start) * 1000 / calls
+
+
+def serving_cost(model, X):
+    """What serving `model` costs, measured through the engine that would serve it
+
+    Returns predict_proba latency for one row and for a batch of 1024 rows
+    (drawn from `X`, dense), the pickled size, and the time to unpickle the
+    estimator and build its engine.
+    """
+    payload = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    start = time.perf_counter()
+    engine = build_engine(pickle.loads(payload))
+    load_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'engine': type(engine).__name__,
+        'predict_ms_batch1': _ms_per_call(engine.predict_proba, X[:1]),
+        'predict_ms_batch1024': _ms_per_call(engine.predict_proba, X[np.arange(1024) % len(X)]),
+        'size_bytes': len(payload),
+        'load_ms': load_ms,
+    }
+
+
+def replay_workload(packed, counts, n_symptoms, seed=42):
+    """The training records replayed as requests, in four variants
+    
+    Each record is sent as recorded, with one or two random symptoms
+    withheld, and as a random non-empty subset. Returns {variant: packed
+    rows}; records left without symptoms are dropped.
+    """
+    rng = np.random.default_rng(seed)
+    records = unpack_rows(np.repeat(packed, counts, axis=0), n_symptoms)
+    
+    def withhold(count_for):
+        rows = records.copy()
+        for row in rows:
+            present = np.flatnonzero(row)
+            row[rng.choice(present, size=count_for(len(present)), replace=False)] = 0
+        return rows
+    
+    workloads = {
+        'full record': records,
+        'one symptom withheld': withhold(lambda n: min(1, n)),
+        'two symptoms withheld': withhold(lambda n: min(2, n)),
+        'random subset': withhold(lambda n: n - rng.integers(1, n + 1)),
+    }
+    return {name: np.packbits(rows[rows.any(axis=1)], axis=1) for name, rows in workloads.items()}
+
+
+def partial_records(X, y, counts, seed=42):
+    """Held-out records as the chatbot sees them: each with a random non-empty subset of its symptoms
+
+    Rows are repeated `counts` times, so every original record is one row.
+    Returns (X, y).
+    """
+    rng = np.random.default_rng(seed)
+    records = np.repeat(X, counts, axis=0)
+    for row in records:
+        present = np.flatnonzero(row)
+        row[rng.choice(present, size=len(present) - rng.integers(1, len(present) + 1), replace=False)] = 0
+    return records, np.repeat(y, counts)
+
+
+def calibration_scores(model, X, y):
+    """Log loss and multi-class Brier score of model.predict_proba on (X, y)"""
+    probabilities = model.predict_proba(X)
+    truth = np.asarray(y)[:, None] == model.classes_[None, :]
+    return {
+        'log_loss': float(log_loss(y, probabilities, labels=model.classes_)),
+        'brier_score': float(((probabilities - truth) ** 2).sum(axis=1).mean()),
+    }
+
+
+def eligible_candidates(candidates, tolerance=0.005, calibration_ratio=2.0):
+    """(accurate, calibrated) report entries; see select_model"""
+    best_accuracy = max(c['test_accuracy'] for c in candidates)
+    accurate = [c for c in candidates if c['test_accuracy'] >= best_accuracy - tolerance]
+    best_log_loss = min(c['log_loss'] for c in accurate)
+    calibrated = [c for c in accurate if c['log_loss'] <= best_log_loss * calibration_ratio]
+    return accurate, calibrated
+
+
+def select_model(candidates, tolerance=0.005, latency_margin=0.5, latency_floor_ms=0.05, calibration_ratio=2.0):
+    """Pick the candidate to serve from report entries (see train_models)
+
+    Every candidate whose test accuracy is within `tolerance` of the best is
+    considered equally accurate. Of those, only candidates whose log loss on
+    partial records is at most `calibration_ratio` times the best one's
+    remain: the follow-up questions depend on confidences meaning what they
+    say, and accuracy on full records cannot tell. Among those, single-row latency only counts
+    when it exceeds the fastest by more than `latency_margin` (relative) and
+    by more than `latency_floor_ms`: sub-millisecond timings differ from run
+    to run by more than the gaps between similar engines. What is still tied
+    goes to the first by name, so the same fits always select the same model.
+    """
+    _, eligible = eligible_candidates(candidates, tolerance, calibration_ratio)
+    fastest = min(c['predict_ms_batch1'] for c in eligible)
+    limit = max(fastest * (1 + latency_margin), fastest + latency_floor_ms)
+    cheap = [c for c in eligible if c['predict_ms_batch1'] <= limit]
+    return min(cheap, key=lambda c: c['name'])
+
+
 class MedicalChatbotModel:
     def __init__(self, dataset_path='dataset/'):
         self.dataset_path = dataset_path
         self.disease_model = None
         self.label_encoder = None
         self.symptom_list = []
+        self.disease_symptom_index = {}
+        self.stage_timings = {}
+        self.candidate_report = []
+        self.selection = None
+        self.posterior_table = None
+        self.posterior_report = None
         
         # Load all datasets
-        self.load_datasets()
+        with self.stage('load datasets'):
+            self.load_datasets()
+    
+    @contextmanager
+    def stage(self, name):
+        """Time a pipeline stage and record it in stage_timings"""
+        start = time.perf_counter()
+        yield
+        self.stage_timings[name] = time.perf_counter() - start
+        print(f"  [{name}: {self.stage_timings[name]:.2f}s]")
         
     def load_datasets(self):
         """Load all medical datasets"""
@@ -57,123 +208,266 @@ class MedicalChatbotModel:
         """Preprocess the disease-symptom dataset"""
         print("\nPreprocessing disease-symptom data...")
         
-        # Extract all symptoms from the dataset
-        symptom_columns = [col for col in self.df_disease.columns if 'Symptom' in col]
-        
-        # Collect all unique symptoms
-        all_symptoms = set()
-        for col in symptom_columns:
-            symptoms = self.df_disease[col].dropna().astype(str)
-            for symptom_string in symptoms:
-                # Split by comma and clean
-                symptom_parts = [s.strip() for s in symptom_string.split(',') if s.strip()]
-                all_symptoms.update(symptom_parts)
-        
-        # Remove empty strings
-        all_symptoms.discard('')
-        self.symptom_list = sorted(list(all_symptoms))
+        # Stack, split and strip all Symptom_* columns at once into a sparse one-hot matrix,
+        # then keep one bit per symptom and one row per distinct (symptoms, disease) record
+        with self.stage('encode symptoms'):
+            X, y, self.symptom_list = encode_symptom_matrix(self.df_disease)
+            self.X, self.y, self.sample_weight = deduplicate(pack_rows(X), y)
         
         print(f"✓ Found {len(self.symptom_list)} unique symptoms")
+        print(f"✓ Created feature matrix with shape: {X.shape}")
+        print(f"✓ Deduplicated to {len(self.X)} distinct symptom patterns")
+        print(f"✓ Number of diseases: {len(set(self.y))}")
+        print(f"✓ Training matrix: {X.shape[0] * X.shape[1] * 8 / 1024:.0f} KB as int64, "
+              f"{matrix_nbytes(X) / 1024:.0f} KB as CSR, {matrix_nbytes(self.X) / 1024:.1f} KB packed and deduplicated")
         
-        # Create feature matrix
-        X = []
-        y = []
-        
-        for idx, row in self.df_disease.iterrows():
-            disease = row['Disease']
-            # Create binary vector for symptoms
-            symptom_vector = [0] * len(self.symptom_list)
-            
-            for col in symptom_columns:
-                if pd.notna(row[col]):
-                    symptom_string = str(row[col])
-                    symptoms = [s.strip() for s in symptom_string.split(',') if s.strip()]
-                    
-                    for symptom in symptoms:
-                        if symptom in self.symptom_list:
-                            symptom_idx = self.symptom_list.index(symptom)
-                            symptom_vector[symptom_idx] = 1
-            
-            # Only add if at least one symptom is present
-            if sum(symptom_vector) > 0:
-                X.append(symptom_vector)
-                y.append(disease)
+        # Disease -> ranked symptoms, used for follow-up suggestions at serve time
+        with self.stage('symptom index'):
+            self.disease_symptom_index = build_disease_symptom_index(self.df_disease)
+        print(f"✓ Built symptom index for {len(self.disease_symptom_index)} diseases")
         
-        self.X = np.array(X)
-        self.y = np.array(y)
-        
-        print(f"✓ Created feature matrix with shape: {self.X.shape}")
-        print(f"✓ Number of diseases: {len(set(y))}")
+        # Severity table names are reconciled with the vocabulary here, not at serve time
+        self.severity_weights = {
+            symptom: int(weight) for symptom, weight in zip(self.df_severity['Symptom'], self.df_severity['weight'])
+        }
+        _, self.severity_report = build_severity_vector(self.severity_weights, self.symptom_list)
+        print(f"✓ Severity weights: {self.severity_report['matched']}/{len(self.symptom_list)} symptoms matched "
+              f"({len(self.severity_report['reconciled'])} by normalized name), "
+              f"{len(self.severity_report['missing'])} default to {self.severity_report['default']}")
+        for symptom, name in self.severity_report['reconciled'].items():
+            print(f"  reconciled {symptom!r} with {name!r}")
         
         return self.X, self.y
     
-    def train_models(self):
-        """Train multiple models and select the best one"""
+    def train_models(self, n_jobs=-1, cv=5, accuracy_tolerance=0.005, latency_margin=0.5, latency_floor_ms=0.05,
+                     calibration_ratio=2.0):
+        """Train multiple models and select the best one
+        
+        Every (candidate, split) fit - the held-out test split plus each CV
+        fold - is an independent joblib task, so they all run in parallel
+        across `n_jobs` processes. Splits are over distinct symptom patterns,
+        so no held-out record has a duplicate in the training data.
+        Candidates within `accuracy_tolerance` of the best test accuracy
+        count as ties. Calibration is scored on the test records with
+        symptoms withheld (partial_records), as patients report them; tied
+        candidates whose log loss there exceeds `calibration_ratio` times
+        the best are dropped. The rest are separated by serving cost beyond
+        `latency_margin` and `latency_floor_ms`, then by name (see
+        select_model).
+        """
         print("\nTraining models...")
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            self.X, self.y, test_size=0.2, random_state=42, stratify=self.y
+        # Split data; the packed bits are unpacked to the estimators' uint8 input only here
+        X_train, X_test, y_train, y_test, w_train, w_test = train_test_split(
+            unpack_rows(self.X, len(self.symptom_list)), self.y, self.sample_weight,
+            test_size=0.2, random_state=42, stratify=self.y
         )
         
         # Define models to train
         models = {
             'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10),
             'Gradient Boosting': GradientBoostingClassifier(n_estimators=100, random_state=42, max_depth=5),
-            'SVM': SVC(kernel='rbf', probability=True, random_state=42)
+            # Naive Bayes and linear probabilities are one matrix product at serve time (LinearEngine)
+            'Bernoulli NB': BernoulliNB(),
+            'Multinomial NB': MultinomialNB(),
+            'Logistic Regression': LogisticRegression(max_iter=1000),
+            # Calibrated probabilities from a small forest, without SVC(probability=True)'s
+            # internal 5-fold Platt fit and its per-support-vector serving cost; ensemble=False
+            # serves one forest plus the calibrators instead of one forest per fold
+            'Calibrated Forest': CalibratedClassifierCV(
+                RandomForestClassifier(n_estimators=20, random_state=42, max_depth=10),
+                method='sigmoid', cv=3, ensemble=False
+            )
         }
         
-        best_model = None
-        best_score = 0
-        best_name = ""
+        # Calibration is judged on incomplete symptom lists: every model is sure of a full record
+        X_partial, y_partial = partial_records(X_test, y_test, w_test)
+        
+        # Same folds as cross_val_score(model, X_train, y_train, cv=cv)
+        folds = list(StratifiedKFold(n_splits=cv).split(np.zeros(len(y_train)), y_train))
         
+        tasks = []
         for name, model in models.items():
-            print(f"\nTraining {name}...")
-            model.fit(X_train, y_train)
-            
-            # Evaluate
-            y_pred = model.predict(X_test)
-            accuracy = accuracy_score(y_test, y_pred)
+            tasks.append((name, 'test', delayed(_fit_and_score)(
+                clone(model), X_train, y_train, w_train, X_test, y_test, w_test
+            )))
+            for train_idx, eval_idx in folds:
+                tasks.append((name, 'cv', delayed(_fit_and_score)(
+                    clone(model), X_train[train_idx], y_train[train_idx], w_train[train_idx],
+                    X_train[eval_idx], y_train[eval_idx], w_train[eval_idx]
+                )))
+        
+        with self.stage('fit candidates'):
+            results = Parallel(n_jobs=n_jobs)(task for _, _, task in tasks)
+        
+        self.candidate_report = []
+        fitted_models = {}
+        
+        for name in models:
+            fitted = [(kind, result) for (task_name, kind, _), result in zip(tasks, results) if task_name == name]
+            model, accuracy, fit_seconds = next(result for kind, result in fitted if kind == 'test')
+            cv_scores = np.array([result[1] for kind, result in fitted if kind == 'cv'])
+            cv_seconds = sum(result[2] for kind, result in fitted if kind == 'cv')
+            fitted_models[name] = model
             
-            # Cross-validation score
-            cv_scores = cross_val_score(model, X_train, y_train, cv=5)
-            cv_mean = cv_scores.mean()
+            # Serving cost, measured here rather than in the workers so candidates do not contend
+            cost = serving_cost(model, X_test)
+            calibration = calibration_scores(model, X_partial, y_partial)
             
+            print(f"\n{name}:")
             print(f"  Test Accuracy: {accuracy:.4f}")
-            print(f"  CV Score: {cv_mean:.4f} (+/- {cv_scores.std():.4f})")
+            print(f"  CV Score: {cv_scores.mean():.4f} (+/- {cv_scores.std():.4f})")
+            print(f"  Partial records: log loss {calibration['log_loss']:.3f}, "
+                  f"Brier {calibration['brier_score']:.3f}")
+            print(f"  Fit time: {fit_seconds:.2f}s (+ {cv_seconds:.2f}s across {cv} folds)")
+            print(f"  Predict time: {cost['predict_ms_batch1']:.3f} ms/row, "
+                  f"{cost['predict_ms_batch1024']:.2f} ms per 1024 rows ({cost['engine']})")
+            print(f"  Model size: {cost['size_bytes'] / 1024:.0f} KB, load {cost['load_ms']:.1f} ms")
             
-            if accuracy > best_score:
-                best_score = accuracy
-                best_model = model
-                best_name = name
+            self.candidate_report.append({
+                'name': name,
+                'estimator': type(model).__name__,
+                'test_accuracy': accuracy,
+                'cv_mean': float(cv_scores.mean()),
+                'cv_std': float(cv_scores.std()),
+                'fit_seconds': fit_seconds,
+                **calibration,
+                **cost,
+            })
+        
+        selected = select_model(
+            self.candidate_report, accuracy_tolerance, latency_margin, latency_floor_ms, calibration_ratio
+        )
+        best_name = selected['name']
+        best_score = selected['test_accuracy']
+        best_model = fitted_models[best_name]
+        accurate, calibrated = eligible_candidates(self.candidate_report, accuracy_tolerance, calibration_ratio)
+        tied = [c['name'] for c in accurate]
+        self.selection = {
+            'selected': best_name,
+            'accuracy_tolerance': accuracy_tolerance,
+            'calibration_ratio': calibration_ratio,
+            'partial_records': len(y_partial),
+            'latency_margin': latency_margin,
+            'latency_floor_ms': latency_floor_ms,
+            'tied': tied,
+            'calibrated': [c['name'] for c in calibrated],
+            'rule': 'highest test accuracy; of the ties within the tolerance, those with partial-record '
+                    'log loss within the calibration ratio of the best; of those, the ones whose batch-1 '
+                    'predict time is within the latency margin (and floor) of the fastest, then by name',
+        }
         
         self.disease_model = best_model
-        print(f"\n✓ Best model: {best_name} with accuracy {best_score:.4f}")
+        print(f"\n✓ Best model: {best_name} with accuracy {best_score:.4f}, "
+              f"partial-record log loss {selected['log_loss']:.3f}")
+        if len(tied) > 1:
+            print(f"  calibrated within {calibration_ratio:g}x of the best log loss: "
+                  f"{', '.join(self.selection['calibrated'])}")
+            print(f"  (of {len(tied)} within {accuracy_tolerance:.3f} accuracy: {', '.join(tied)}; "
+                  f"latency within {latency_margin:.0%} or {latency_floor_ms} ms of the fastest counts as equal, "
+                  f"then by name)")
         
         # Final evaluation
         y_pred_final = self.disease_model.predict(X_test)
         print("\nFinal Model Performance:")
-        print(classification_report(y_test, y_pred_final))
+        print(classification_report(y_test, y_pred_final, sample_weight=w_test, zero_division=0))
         
         return self.disease_model
     
-    def save_model(self, filename='medical_chatbot_model.pkl'):
-        """Save the trained model and associated data"""
-        print(f"\nSaving model to {filename}...")
-        
-        model_data = {
-            'model': self.disease_model,
-            'symptom_list': self.symptom_list,
-            'df_severity': self.df_severity,
-            'df_description': self.df_description,
-            'df_precaution': self.df_precaution,
-            'df_diet': self.df_diet
+    def build_posterior_table(self):
+        """Precompute predict_proba for the training patterns and their leave-one-out subsets
+        
+        The hit ratio is measured on replay_workload, against the packed keys
+        the server will look up. The table is kept only when it serves those
+        replayed requests, hits and misses alike, faster than the selected
+        model's engine both one row at a time and 1024 rows per call;
+        otherwise the engine is served directly and the artifact gets no table.
+        """
+        n_symptoms = len(self.symptom_list)
+        engine = build_engine(self.disease_model)
+        keys, probabilities = build_posterior_table(engine, self.X, n_symptoms)
+        
+        stored = {key.tobytes() for key in keys}
+        workload = replay_workload(self.X, self.sample_weight, n_symptoms)
+        hit_ratio = {
+            name: float(np.mean([row.tobytes() in stored for row in rows])) for name, rows in workload.items()
         }
         
-        with open(filename, 'wb') as f:
-            pickle.dump(model_data, f)
+        rng = np.random.default_rng(42)
+        requests = np.vstack(list(workload.values()))
+        requests = unpack_rows(requests[rng.choice(len(requests), size=1024)], n_symptoms)
         
-        print(f"✓ Model saved successfully!")
+        def row_by_row(predictor):
+            return lambda X: [predictor.predict_proba(X[i:i + 1]) for i in range(len(X))]
+        
+        latency = {}
+        for name, predictor in (('engine', engine), ('table', PosteriorTable(keys, probabilities, engine))):
+            latency[f'{name}_ms_batch1'] = _ms_per_call(row_by_row(predictor), requests[:256]) / 256
+            latency[f'{name}_ms_batch1024'] = _ms_per_call(predictor.predict_proba, requests)
+        faster = all(latency[f'table_ms_{b}'] < latency[f'engine_ms_{b}'] for b in ('batch1', 'batch1024'))
+        
+        self.posterior_table = (keys, probabilities) if faster else None
+        self.posterior_report = {
+            'stored': faster,
+            'entries': len(keys),
+            'size_bytes': int(keys.nbytes + probabilities.nbytes),
+            'hit_ratio': hit_ratio,
+            'engine': type(engine).__name__,
+            **latency,
+        }
+        
+        print(f"✓ Posterior table: {len(keys)} patterns, {self.posterior_report['size_bytes'] / 1024:.0f} KB, "
+              f"{'stored' if faster else f'not stored: {type(engine).__name__} alone is faster'}")
+        for batch in ('batch1', 'batch1024'):
+            print(f"  {batch:<10} table {latency[f'table_ms_{batch}']:.4f} ms, "
+                  f"{type(engine).__name__} {latency[f'engine_ms_{batch}']:.4f} ms per call")
+        for name, ratio in hit_ratio.items():
+            print(f"  hit ratio, {name:<24}{ratio:>7.1%}")
+        return self.posterior_table
+    
+    def training_report(self):
+        """Candidates, selection and stage timings, as stored next to the artifact"""
+        return {
+            'dataset': {
+                'rows': int(self.sample_weight.sum()),
+                'distinct_patterns': int(self.X.shape[0]),
+                'symptoms': len(self.symptom_list),
+                'diseases': len(self.disease_symptom_index),
+            },
+            'selection': self.selection,
+            'posterior_table': self.posterior_report,
+            'severity': self.severity_report,
+            'candidates': [
+                {key: (round(value, 6) if isinstance(value, float) else value) for key, value in candidate.items()}
+                for candidate in self.candidate_report
+            ],
+            'stage_timings': {name: round(seconds, 3) for name, seconds in self.stage_timings.items()},
+        }
+    
+    def save_model(self, artifact_root=DEFAULT_ARTIFACT_ROOT):
+        """Save the trained model and associated data as a new artifact version"""
+        print(f"\nSaving model to {artifact_root}/...")
+        
+        version_dir = save_artifact(
+            artifact_root,
+            model=self.disease_model,
+            symptom_list=self.symptom_list,
+            disease_symptom_index=self.disease_symptom_index,
+            knowledge_base=build_knowledge_base(
+                self.df_description, self.df_precaution, self.severity_weights, self.symptom_list,
+                self.disease_symptom_index
+            ),
+            severity_weights=self.severity_weights,
+            diet_table=diet_table_from_dataframe(self.df_diet),
+            symptom_likelihood=build_symptom_likelihood(
+                self.disease_symptom_index, self.disease_model.classes_, self.symptom_list
+            ),
+            training_report=self.training_report(),
+            posterior_table=self.posterior_table
+        )
+        
+        print(f"✓ Model saved successfully to {version_dir}")
+        return version_dir
     
     def get_disease_info(self, disease):
         """Get comprehensive information about a disease"""
@@ -213,13 +507,20 @@ def main():
     chatbot = MedicalChatbotModel()
     
     # Preprocess data
-    X, y = chatbot.preprocess_disease_data()
+    with chatbot.stage('preprocess'):
+        X, y = chatbot.preprocess_disease_data()
     
     # Train models
-    model = chatbot.train_models()
+    with chatbot.stage('train'):
+        model = chatbot.train_models()
+    
+    # Precompute the posterior of every training pattern, if a lookup beats the model
+    with chatbot.stage('posterior table'):
+        chatbot.build_posterior_table()
     
     # Save model
-    chatbot.save_model('medical_chatbot_model.pkl')
+    with chatbot.stage('save'):
+        chatbot.save_model()
     
     # Test prediction
     print("\n" + "=" * 60)
@@ -228,14 +529,13 @@ def main():
     
     # Example: Test with symptoms of common cold
     test_symptoms = ['cough', 'high_fever', 'breathlessness']
-    test_vector = [0] * len(chatbot.symptom_list)
+    test_vector = np.zeros((1, len(chatbot.symptom_list)), dtype=np.uint8)
     
     for symptom in test_symptoms:
         if symptom in chatbot.symptom_list:
             idx = chatbot.symptom_list.index(symptom)
-            test_vector[idx] = 1
-    
-    test_vector = np.array(test_vector).reshape(1, -1)
+            test_vector[0, idx] = 1
+
     prediction = chatbot.disease_model.predict(test_vector)[0]
     probabilities = chatbot.disease_model.predict_proba(test_vector)[0]
     
@@ -257,6 +557,10 @@ def main():
     for i, prec in enumerate(info['precautions'], 1):
         print(f"  {i}. {prec}")
     
+    print("\nStage timings:")
+    for name, seconds in chatbot.stage_timings.items():
+        print(f"  {name:<20}{seconds:>8.2f}s")
+    
     print("\n" + "=" * 60)
     print("Training Complete!")
     print("=" * 60)